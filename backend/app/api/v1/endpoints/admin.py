@@ -2,7 +2,10 @@
 Admin and Coaching API endpoints
 """
 
-from typing import Dict, Any, List
+import asyncio
+import re
+from collections import Counter
+from typing import Dict, Any, List, Optional
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from loguru import logger
@@ -11,6 +14,28 @@ from app.core.database import get_database
 
 router = APIRouter()
 
+# Failure categories reported by /failed-scans, in display order
+_FAILURE_PATTERNS = (
+    ("API Connection Issues", "Check API credentials and rate limits"),
+    ("Processing Timeouts", "Optimize processing pipeline or increase timeout limits"),
+    ("Data Validation Errors", "Improve input validation and data sanitization"),
+)
+
+_FAILURE_KEYWORD_CATEGORIES = {
+    "api": "API Connection Issues",
+    "openai": "API Connection Issues",
+    "timeout": "Processing Timeouts",
+    "time": "Processing Timeouts",
+    "validation": "Data Validation Errors",
+    "invalid": "Data Validation Errors",
+}
+
+# Lookahead so overlapping keywords are all found, matching plain substring checks
+_FAILURE_KEYWORD_PATTERN = re.compile(
+    r"(?=(" + "|".join(_FAILURE_KEYWORD_CATEGORIES) + r"))",
+    re.IGNORECASE
+)
+
 class SystemStatsResponse(BaseModel):
     """System statistics response"""
     total_scans: int
@@ -27,34 +52,49 @@ async def get_system_statistics():
     Get system-wide statistics and metrics
     """
     try:
-        # Get all market scans for analysis
-        all_scans = await get_database().get_market_scans(limit=1000)
-        
-        # Calculate statistics
-        total_scans = len(all_scans)
-        completed_scans = len([s for s in all_scans if s.get('status') == 'completed'])
-        pending_scans = len([s for s in all_scans if s.get('status') == 'pending'])
-        failed_scans = len([s for s in all_scans if s.get('status') == 'failed'])
-        
-        # Calculate average processing time
-        processing_times = [
-            s.get('processing_time_seconds', 0) 
-            for s in all_scans 
-            if s.get('processing_time_seconds')
-        ]
-        avg_processing_time = sum(processing_times) / len(processing_times) if processing_times else 0
-        
-        # Top role categories
-        role_counts = {}
-        for scan in all_scans:
-            role = scan.get('role_category', 'Unknown')
-            role_counts[role] = role_counts.get(role, 0) + 1
-        
-        top_roles = sorted(role_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-        top_role_categories = [{"role": role, "count": count} for role, count in top_roles]
-        
-        # Recent activity (last 10 scans)
-        recent_scans = sorted(all_scans, key=lambda x: x.get('created_at', ''), reverse=True)[:10]
+        db = get_database()
+
+        # Dashboard aggregates come from a materialized view refreshed every minute;
+        # recent activity is a cheap indexed read, so it stays live
+        snapshot, recent_scans = await asyncio.gather(
+            db.get_system_stats_snapshot(),
+            db.get_market_scans(
+                limit=10,
+                columns='id,client_name,job_title,status,created_at'
+            )
+        )
+
+        if snapshot:
+            total_scans = snapshot['total_scans']
+            completed_scans = snapshot['completed_scans']
+            pending_scans = snapshot['pending_scans']
+            failed_scans = snapshot['failed_scans']
+            avg_processing_time = snapshot['average_processing_time']
+            top_role_categories = snapshot['top_role_categories']
+        else:
+            # View not available yet, aggregate directly (one row per status comes back)
+            status_counts, top_roles = await asyncio.gather(
+                db.get_scan_status_counts(),
+                db.get_top_role_categories(limit=5)
+            )
+
+            counts_by_status = {row['status']: row['scan_count'] for row in status_counts}
+            total_scans = sum(counts_by_status.values())
+            completed_scans = counts_by_status.get('completed', 0)
+            pending_scans = counts_by_status.get('pending', 0)
+            failed_scans = counts_by_status.get('failed', 0)
+
+            # Combine per-status averages, weighted by the number of timed scans
+            timed_scans = sum(row['timed_count'] for row in status_counts)
+            total_processing_time = sum(
+                (row['avg_processing_time'] or 0) * row['timed_count']
+                for row in status_counts
+            )
+            avg_processing_time = total_processing_time / timed_scans if timed_scans else 0
+
+            top_role_categories = [{"role": row['role'], "count": row['count']} for row in top_roles]
+
+        # Recent activity (last 10 scans, already ordered by created_at desc)
         recent_activity = [
             {
                 "id": scan['id'],
@@ -86,52 +126,70 @@ async def get_quality_metrics():
     Get quality metrics for coaching and improvement
     """
     try:
-        all_scans = await get_database().get_market_scans(limit=500)
-        completed_scans = [s for s in all_scans if s.get('status') == 'completed']
+        db = get_database()
+        completed_scans = await db.get_market_scans_by_status(
+            'completed',
+            limit=500,
+            columns='confidence_score,processing_time_seconds,complexity_score:job_analysis->complexity_score'
+        )
         
         if not completed_scans:
+            status_counts = await db.get_scan_status_counts()
             return {
                 "message": "No completed scans available for quality analysis",
-                "total_scans": len(all_scans)
+                "total_scans": sum(row['scan_count'] for row in status_counts)
             }
         
-        # Analyze confidence scores
-        confidence_scores = [
-            s.get('confidence_score', 0) 
-            for s in completed_scans 
-            if s.get('confidence_score')
-        ]
+        # Accumulate every metric in a single pass; falsy (missing or zero) values are skipped
+        confidence_count = confidence_total = high_confidence = low_confidence = 0
+        complexity_count = complexity_total = high_complexity = low_complexity = 0
+        processing_count = processing_total = 0
+        fastest_processing = slowest_processing = None
         
-        # Analyze complexity distribution
-        complexity_scores = []
         for scan in completed_scans:
-            job_analysis = scan.get('job_analysis', {})
-            if job_analysis.get('complexity_score'):
-                complexity_scores.append(job_analysis['complexity_score'])
-        
-        # Processing time analysis
-        processing_times = [
-            s.get('processing_time_seconds', 0) 
-            for s in completed_scans 
-            if s.get('processing_time_seconds')
-        ]
+            confidence = scan.get('confidence_score')
+            if confidence:
+                confidence_count += 1
+                confidence_total += confidence
+                if confidence > 0.8:
+                    high_confidence += 1
+                elif confidence < 0.6:
+                    low_confidence += 1
+            
+            complexity = scan.get('complexity_score')
+            if complexity:
+                complexity_count += 1
+                complexity_total += complexity
+                if complexity > 7:
+                    high_complexity += 1
+                elif complexity < 4:
+                    low_complexity += 1
+            
+            processing_time = scan.get('processing_time_seconds')
+            if processing_time:
+                processing_count += 1
+                processing_total += processing_time
+                if fastest_processing is None or processing_time < fastest_processing:
+                    fastest_processing = processing_time
+                if slowest_processing is None or processing_time > slowest_processing:
+                    slowest_processing = processing_time
         
         return {
             "total_completed_scans": len(completed_scans),
             "confidence_metrics": {
-                "average_confidence": sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0,
-                "high_confidence_count": len([c for c in confidence_scores if c > 0.8]),
-                "low_confidence_count": len([c for c in confidence_scores if c < 0.6])
+                "average_confidence": confidence_total / confidence_count if confidence_count else 0,
+                "high_confidence_count": high_confidence,
+                "low_confidence_count": low_confidence
             },
             "complexity_analysis": {
-                "average_complexity": sum(complexity_scores) / len(complexity_scores) if complexity_scores else 0,
-                "high_complexity_count": len([c for c in complexity_scores if c > 7]),
-                "low_complexity_count": len([c for c in complexity_scores if c < 4])
+                "average_complexity": complexity_total / complexity_count if complexity_count else 0,
+                "high_complexity_count": high_complexity,
+                "low_complexity_count": low_complexity
             },
             "performance_metrics": {
-                "average_processing_time": sum(processing_times) / len(processing_times) if processing_times else 0,
-                "fastest_processing": min(processing_times) if processing_times else 0,
-                "slowest_processing": max(processing_times) if processing_times else 0
+                "average_processing_time": processing_total / processing_count if processing_count else 0,
+                "fastest_processing": fastest_processing or 0,
+                "slowest_processing": slowest_processing or 0
             }
         }
         
@@ -145,25 +203,29 @@ async def get_failed_scans():
     Get failed scans for debugging and improvement
     """
     try:
-        all_scans = await get_database().get_market_scans(limit=200)
-        failed_scans = [s for s in all_scans if s.get('status') == 'failed']
-        
+        # Page through failed scans and keep only the summary fields, not full descriptions
         failed_analysis = []
-        for scan in failed_scans:
+        error_messages = []
+        async for scan in get_database().iter_market_scans(
+            columns='id,client_name,job_title,error_message,created_at,job_description,hiring_challenges',
+            status='failed',
+            limit=200
+        ):
+            error_messages.append(scan.get('error_message'))
             failed_analysis.append({
                 "id": scan['id'],
                 "client_name": scan['client_name'],
                 "job_title": scan['job_title'],
                 "error_message": scan.get('error_message', 'Unknown error'),
                 "created_at": scan['created_at'],
-                "job_description_length": len(scan.get('job_description', '')),
+                "job_description_length": len(scan.get('job_description') or ''),
                 "has_hiring_challenges": bool(scan.get('hiring_challenges'))
             })
         
         return {
-            "total_failed": len(failed_scans),
+            "total_failed": len(failed_analysis),
             "failed_scans": failed_analysis,
-            "common_issues": analyze_common_failure_patterns(failed_scans)
+            "common_issues": analyze_common_failure_patterns(error_messages)
         }
         
     except Exception as e:
@@ -179,33 +241,29 @@ async def retrain_recommendations():
         # In a real implementation, this would trigger ML model retraining
         # For now, we'll just analyze current data quality
         
-        all_scans = await get_database().get_market_scans(limit=1000)
-        completed_scans = [s for s in all_scans if s.get('status') == 'completed']
+        db = get_database()
+        status_counts, role_rows, region_rows = await asyncio.gather(
+            db.get_scan_status_counts(),
+            db.get_scan_role_distribution('completed'),
+            db.get_scan_region_coverage('completed')
+        )
+        total_samples = next(
+            (row['scan_count'] for row in status_counts if row['status'] == 'completed'),
+            0
+        )
         
         training_data_quality = {
-            "total_training_samples": len(completed_scans),
-            "role_distribution": {},
-            "region_coverage": {},
+            "total_training_samples": total_samples,
+            "role_distribution": {row['role']: row['count'] for row in role_rows},
+            "region_coverage": {row['region']: row['count'] for row in region_rows},
             "quality_score": 0.0
         }
         
-        # Analyze role distribution
-        for scan in completed_scans:
-            role = scan.get('role_category', 'Unknown')
-            training_data_quality["role_distribution"][role] = training_data_quality["role_distribution"].get(role, 0) + 1
-        
-        # Analyze region coverage
-        for scan in completed_scans:
-            job_analysis = scan.get('job_analysis', {})
-            regions = job_analysis.get('recommended_regions', [])
-            for region in regions:
-                training_data_quality["region_coverage"][region] = training_data_quality["region_coverage"].get(region, 0) + 1
-        
         # Calculate quality score (simplified)
-        if len(completed_scans) > 50:
-            training_data_quality["quality_score"] = min(0.95, len(completed_scans) / 100)
+        if total_samples > 50:
+            training_data_quality["quality_score"] = min(0.95, total_samples / 100)
         else:
-            training_data_quality["quality_score"] = len(completed_scans) / 50 * 0.5
+            training_data_quality["quality_score"] = total_samples / 50 * 0.5
         
         return {
             "status": "retraining_initiated",
@@ -218,43 +276,27 @@ async def retrain_recommendations():
         logger.error(f"❌ Failed to initiate retraining: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to initiate retraining: {str(e)}")
 
-def analyze_common_failure_patterns(failed_scans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def analyze_common_failure_patterns(error_messages: List[Optional[str]]) -> List[Dict[str, Any]]:
     """
-    Analyze common patterns in failed scans
+    Analyze common patterns in the error messages of failed scans
     """
-    patterns = []
-    
-    # Check for common error patterns
-    error_messages = [scan.get('error_message', '') for scan in failed_scans]
-    
-    # Count API-related errors
-    api_errors = len([msg for msg in error_messages if 'api' in msg.lower() or 'openai' in msg.lower()])
-    if api_errors > 0:
-        patterns.append({
-            "pattern": "API Connection Issues",
-            "count": api_errors,
-            "percentage": round(api_errors / len(failed_scans) * 100, 1),
-            "recommendation": "Check API credentials and rate limits"
+    # Count each failure category at most once per scan, in a single pass over the messages
+    category_counts = Counter()
+    for message in error_messages:
+        category_counts.update({
+            _FAILURE_KEYWORD_CATEGORIES[keyword.lower()]
+            for keyword in _FAILURE_KEYWORD_PATTERN.findall(message or '')
         })
     
-    # Check for timeout errors
-    timeout_errors = len([msg for msg in error_messages if 'timeout' in msg.lower() or 'time' in msg.lower()])
-    if timeout_errors > 0:
-        patterns.append({
-            "pattern": "Processing Timeouts",
-            "count": timeout_errors,
-            "percentage": round(timeout_errors / len(failed_scans) * 100, 1),
-            "recommendation": "Optimize processing pipeline or increase timeout limits"
-        })
-    
-    # Check for data validation errors
-    validation_errors = len([msg for msg in error_messages if 'validation' in msg.lower() or 'invalid' in msg.lower()])
-    if validation_errors > 0:
-        patterns.append({
-            "pattern": "Data Validation Errors",
-            "count": validation_errors,
-            "percentage": round(validation_errors / len(failed_scans) * 100, 1),
-            "recommendation": "Improve input validation and data sanitization"
-        })
+    patterns = []
+    for category, recommendation in _FAILURE_PATTERNS:
+        count = category_counts[category]
+        if count > 0:
+            patterns.append({
+                "pattern": category,
+                "count": count,
+                "percentage": round(count / len(error_messages) * 100, 1),
+                "recommendation": recommendation
+            })
     
-    return patterns
\ No newline at end of file
+    return patterns
@@ -2,16 +2,72 @@
 Job Analysis API endpoints
 """
 
-from typing import Dict, Any, List
+import asyncio
+from typing import Dict, List
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from loguru import logger
 
 from app.core.ai_service import ai_service
+from app.core.cache import TTLCache
 from app.core.database import get_database
+from app.services.embedding_service import embedding_service
 
 router = APIRouter()
 
+# Role mappings change rarely, so keep them for a few minutes between database reads
+ROLE_MAPPINGS_TTL_SECONDS = 300
+_ROLE_MAPPINGS_KEY = "role_mappings"
+_role_mappings_cache = TTLCache(maxsize=1, ttl=ROLE_MAPPINGS_TTL_SECONDS)
+
+# Semantic comparison settings for /compare
+COMPARE_SIMILARITY_THRESHOLD = 0.70
+COMPARE_MAX_RESULTS = 5
+
+# Default categories returned when the roles table is empty
+_DEFAULT_CATEGORIES = (
+    {
+        "core_role": "Brand Marketing Manager",
+        "common_titles": ["Creative Project Manager", "Marketing Project Manager", "Production Manager", "Marketing Operations Manager"],
+        "description": "Manages brand marketing campaigns and creative projects"
+    },
+    {
+        "core_role": "Community Manager", 
+        "common_titles": ["Social Media Manager", "Influencer Coordinator", "Affiliate Manager", "Partnerships Coordinator"],
+        "description": "Manages online communities and social media presence"
+    },
+    {
+        "core_role": "Content Marketer",
+        "common_titles": ["Brand Content Manager", "Content Strategist", "Digital Content Manager", "Creative Content Manager"],
+        "description": "Creates and manages content marketing strategies"
+    },
+    {
+        "core_role": "Retention Manager",
+        "common_titles": ["Email Marketing Manager", "Lifecycle Marketing Manager", "CRM Manager"],
+        "description": "Focuses on customer retention and lifecycle marketing"
+    },
+    {
+        "core_role": "Ecommerce Manager",
+        "common_titles": ["E-commerce Manager", "Shopify Manager", "E-commerce Operations Manager", "E-commerce Project Manager", "Digital Commerce Manager"],
+        "description": "Manages online store operations and e-commerce strategy"
+    },
+    {
+        "core_role": "Sales Operations Manager",
+        "common_titles": ["Operations Manager", "RevOps Manager", "Amazon/Shopify/Sales Channel Manager"],
+        "description": "Optimizes sales processes and revenue operations"
+    },
+    {
+        "core_role": "Data Analyst",
+        "common_titles": ["Data Engineer", "Marketing Data Analyst", "Business Intelligence Analyst", "Digital Analytics Specialist", "Reporting Analyst", "Performance Marketing Analyst"],
+        "description": "Analyzes data to drive business insights and decisions"
+    },
+    {
+        "core_role": "Logistics Manager",
+        "common_titles": ["Supply Chain Coordinator", "Operations Manager", "Fulfillment Operations Manager", "Freight Coordinator", "EDI/ERP Coordinator"],
+        "description": "Manages supply chain and logistics operations"
+    }
+)
+
 class JobAnalysisRequest(BaseModel):
     """Request for standalone job analysis"""
     job_title: str
@@ -62,10 +118,12 @@ async def compare_job_to_historical(request: JobAnalysisRequest):
     Compare a job description to historical market scans
     """
     try:
-        # Find similar historical scans
-        similar_scans = await get_database().search_similar_scans(
+        # Ranking happens in the vector index; results come back ordered by cosine similarity
+        similar_scans = await embedding_service.find_similar_scans(
             job_title=request.job_title,
-            job_description=request.job_description
+            job_description=request.job_description,
+            top_k=COMPARE_MAX_RESULTS,
+            similarity_threshold=COMPARE_SIMILARITY_THRESHOLD
         )
         
         if not similar_scans:
@@ -75,19 +133,28 @@ async def compare_job_to_historical(request: JobAnalysisRequest):
                 "recommendations": "This appears to be a unique role. Consider creating a comprehensive market scan."
             }
         
-        # Analyze similarities
-        comparison_results = []
-        for scan in similar_scans[:5]:  # Limit to top 5
-            similarity_score = calculate_job_similarity(request, scan)
-            comparison_results.append({
-                "scan_id": scan['id'],
+        # Pay bands live in the database, fetch them for all matches in one query
+        scan_rows = await get_database().get_market_scans_by_ids(
+            [scan['scan_id'] for scan in similar_scans],
+            columns='id,salary_recommendations'
+        )
+        pay_bands = {
+            row['id']: (row.get('salary_recommendations') or {}).get('recommended_pay_band')
+            for row in scan_rows
+        }
+        
+        comparison_results = [
+            {
+                "scan_id": scan['scan_id'],
                 "job_title": scan['job_title'],
-                "company": scan.get('company_domain', 'Unknown'),
-                "similarity_score": similarity_score,
+                "company": scan.get('company_domain') or 'Unknown',
+                "similarity_score": scan['similarity_score'],
                 "role_category": scan.get('role_category'),
-                "salary_range": scan.get('salary_recommendations', {}).get('recommended_pay_band'),
+                "salary_range": pay_bands.get(scan['scan_id']),
                 "created_date": scan.get('created_at')
-            })
+            }
+            for scan in similar_scans
+        ]
         
         return {
             "similar_roles_found": len(comparison_results),
@@ -106,54 +173,15 @@ async def get_role_categories():
     Get available role categories and their common titles
     """
     try:
-        role_mappings = await get_database().get_role_mappings()
+        # Empty or failed lookups are not cached, so they are retried on the next request
+        role_mappings = await _role_mappings_cache.get_or_set(
+            _ROLE_MAPPINGS_KEY,
+            get_database().get_role_mappings
+        )
         
         if not role_mappings:
             # Return default categories if no data in database
-            return {
-                "categories": [
-                    {
-                        "core_role": "Brand Marketing Manager",
-                        "common_titles": ["Creative Project Manager", "Marketing Project Manager", "Production Manager", "Marketing Operations Manager"],
-                        "description": "Manages brand marketing campaigns and creative projects"
-                    },
-                    {
-                        "core_role": "Community Manager", 
-                        "common_titles": ["Social Media Manager", "Influencer Coordinator", "Affiliate Manager", "Partnerships Coordinator"],
-                        "description": "Manages online communities and social media presence"
-                    },
-                    {
-                        "core_role": "Content Marketer",
-                        "common_titles": ["Brand Content Manager", "Content Strategist", "Digital Content Manager", "Creative Content Manager"],
-                        "description": "Creates and manages content marketing strategies"
-                    },
-                    {
-                        "core_role": "Retention Manager",
-                        "common_titles": ["Email Marketing Manager", "Lifecycle Marketing Manager", "CRM Manager"],
-                        "description": "Focuses on customer retention and lifecycle marketing"
-                    },
-                    {
-                        "core_role": "Ecommerce Manager",
-                        "common_titles": ["E-commerce Manager", "Shopify Manager", "E-commerce Operations Manager", "E-commerce Project Manager", "Digital Commerce Manager"],
-                        "description": "Manages online store operations and e-commerce strategy"
-                    },
-                    {
-                        "core_role": "Sales Operations Manager",
-                        "common_titles": ["Operations Manager", "RevOps Manager", "Amazon/Shopify/Sales Channel Manager"],
-                        "description": "Optimizes sales processes and revenue operations"
-                    },
-                    {
-                        "core_role": "Data Analyst",
-                        "common_titles": ["Data Engineer", "Marketing Data Analyst", "Business Intelligence Analyst", "Digital Analytics Specialist", "Reporting Analyst", "Performance Marketing Analyst"],
-                        "description": "Analyzes data to drive business insights and decisions"
-                    },
-                    {
-                        "core_role": "Logistics Manager",
-                        "common_titles": ["Supply Chain Coordinator", "Operations Manager", "Fulfillment Operations Manager", "Freight Coordinator", "EDI/ERP Coordinator"],
-                        "description": "Manages supply chain and logistics operations"
-                    }
-                ]
-            }
+            return {"categories": _DEFAULT_CATEGORIES}
         
         return {"categories": role_mappings}
         
@@ -167,48 +195,26 @@ async def get_common_skills_for_role(role_category: str):
     Get common skills and tools for a specific role category
     """
     try:
-        # Get historical data for this role
-        historical_scans = await get_database().get_market_scans(limit=50)
-        role_scans = [
-            scan for scan in historical_scans 
-            if scan.get('role_category') == role_category
-        ]
+        # Skill frequencies are aggregated in Postgres; the three queries are independent
+        db = get_database()
+        scan_count, top_must_have, top_nice_to_have = await asyncio.gather(
+            db.count_market_scans(role_category=role_category),
+            db.get_skill_frequencies(role_category, 'must_have_skills'),
+            db.get_skill_frequencies(role_category, 'nice_to_have_skills')
+        )
         
-        if not role_scans:
+        if not scan_count:
             return {
                 "role_category": role_category,
                 "message": "No historical data found for this role",
                 "suggested_skills": get_default_skills_for_role(role_category)
             }
         
-        # Aggregate skills from historical scans
-        all_must_have = []
-        all_nice_to_have = []
-        
-        for scan in role_scans:
-            job_analysis = scan.get('job_analysis', {})
-            all_must_have.extend(job_analysis.get('must_have_skills', []))
-            all_nice_to_have.extend(job_analysis.get('nice_to_have_skills', []))
-        
-        # Count frequency and return most common
-        must_have_freq = {}
-        nice_to_have_freq = {}
-        
-        for skill in all_must_have:
-            must_have_freq[skill] = must_have_freq.get(skill, 0) + 1
-            
-        for skill in all_nice_to_have:
-            nice_to_have_freq[skill] = nice_to_have_freq.get(skill, 0) + 1
-        
-        # Sort by frequency
-        top_must_have = sorted(must_have_freq.items(), key=lambda x: x[1], reverse=True)[:10]
-        top_nice_to_have = sorted(nice_to_have_freq.items(), key=lambda x: x[1], reverse=True)[:10]
-        
         return {
             "role_category": role_category,
-            "historical_scans_analyzed": len(role_scans),
-            "most_common_must_have": [{"skill": skill, "frequency": freq} for skill, freq in top_must_have],
-            "most_common_nice_to_have": [{"skill": skill, "frequency": freq} for skill, freq in top_nice_to_have]
+            "historical_scans_analyzed": scan_count,
+            "most_common_must_have": [{"skill": row['skill'], "frequency": row['freq']} for row in top_must_have],
+            "most_common_nice_to_have": [{"skill": row['skill'], "frequency": row['freq']} for row in top_nice_to_have]
         }
         
     except Exception as e:
@@ -216,26 +222,6 @@ async def get_common_skills_for_role(role_category: str):
         raise HTTPException(status_code=500, detail=f"Failed to retrieve skills: {str(e)}")
 
 # Helper functions
-def calculate_job_similarity(request: JobAnalysisRequest, historical_scan: Dict[str, Any]) -> float:
-    """
-    Calculate similarity score between job request and historical scan
-    """
-    # Simple similarity calculation based on title and description keywords
-    # In production, this would use vector similarity or more sophisticated NLP
-    
-    title_words = set(request.job_title.lower().split())
-    hist_title_words = set(historical_scan.get('job_title', '').lower().split())
-    
-    desc_words = set(request.job_description.lower().split())
-    hist_desc_words = set(historical_scan.get('job_description', '').lower().split())
-    
-    # Calculate Jaccard similarity
-    title_similarity = len(title_words.intersection(hist_title_words)) / len(title_words.union(hist_title_words)) if title_words.union(hist_title_words) else 0
-    desc_similarity = len(desc_words.intersection(hist_desc_words)) / len(desc_words.union(hist_desc_words)) if desc_words.union(hist_desc_words) else 0
-    
-    # Weighted average (title weighted more heavily)
-    return (title_similarity * 0.7 + desc_similarity * 0.3)
-
 def get_default_skills_for_role(role_category: str) -> Dict[str, List[str]]:
     """
     Get default skills when no historical data is available
@@ -2,15 +2,106 @@
 Candidate Profiles API endpoints
 """
 
-from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+import copy
+import heapq
+from collections import Counter
+from itertools import chain, islice
+from operator import itemgetter
+from typing import List, Optional, Dict, Any, Tuple
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from loguru import logger
 
+from app.core.cache import TTLCache
 from app.core.database import get_database
+from app.core.pagination import decode_cursor, next_page_cursor
 
 router = APIRouter()
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Timezone overlap notes shown with regional candidate insights
+_TIMEZONE_MAP: Dict[str, str] = {
+    "Philippines": "GMT+8 (Manila) - Good overlap with US West Coast",
+    "Latin America": "GMT-3 to GMT-5 - Excellent overlap with US time zones", 
+    "South Africa": "GMT+2 (Cape Town) - Good overlap with European hours",
+    "United States": "Various time zones - Local talent"
+}
+
+# Role match score bonus per experience band, in priority order. experience_years is free text
+# ("5-8 years", "Senior (5-8 years)", "5-8yrs"), so the first band it contains wins.
+# Keep in sync with candidate_profiles_ranked_for_role in the database migrations.
+_EXPERIENCE_BONUS: Tuple[Tuple[str, float], ...] = (
+    ("5-8", 0.15),
+    ("9+", 0.15),
+    ("3-6", 0.1),
+)
+
+# Candidate profiles change rarely; cache database lookups per filter set for a few minutes.
+# The cache is per process rather than shared through Redis: a hit stays a dictionary lookup with
+# no network round trip, and each API worker serving results up to the TTL old is acceptable here.
+CANDIDATE_CACHE_TTL_SECONDS = 300
+_candidate_cache = TTLCache(maxsize=256, ttl=CANDIDATE_CACHE_TTL_SECONDS)
+
+# Mock candidate data used when the database has no profiles, built once at import
+_MOCK_CANDIDATES: Tuple[Dict[str, Any], ...] = (
+    {
+        "id": "candidate_1",
+        "name": "Maria Santos",
+        "role_category": "Ecommerce Manager",
+        "experience_years": "5-8 years",
+        "region": "Philippines",
+        "skills": ["Shopify Admin", "Google Analytics", "Email Marketing", "Project Management"],
+        "bio": "Experienced e-commerce manager with 6 years of experience managing Shopify stores for US-based brands. Specialized in conversion optimization and customer retention strategies.",
+        "video_url": "https://example.com/videos/maria_intro.mp4",
+        "resume_url": "https://example.com/resumes/maria_santos.pdf",
+        "hourly_rate": 15,
+        "availability": "Available",
+        "english_proficiency": "Fluent",
+        "timezone": "GMT+8"
+    },
+    {
+        "id": "candidate_2", 
+        "name": "Carlos Rodriguez",
+        "role_category": "Data Analyst",
+        "experience_years": "3-6 years",
+        "region": "Latin America",
+        "skills": ["Excel Advanced", "SQL", "Python", "Tableau", "Google Analytics"],
+        "bio": "Data analyst with strong background in e-commerce analytics and reporting. Experience with large datasets and automated reporting systems.",
+        "video_url": "https://example.com/videos/carlos_intro.mp4",
+        "resume_url": "https://example.com/resumes/carlos_rodriguez.pdf",
+        "hourly_rate": 18,
+        "availability": "Available",
+        "english_proficiency": "Advanced",
+        "timezone": "GMT-3"
+    },
+    {
+        "id": "candidate_3",
+        "name": "Thandiwe Mokwena", 
+        "role_category": "Content Marketer",
+        "experience_years": "2-4 years",
+        "region": "South Africa",
+        "skills": ["Content Creation", "Social Media", "SEO", "Adobe Creative Suite"],
+        "bio": "Creative content marketer with experience in B2C brands. Strong background in social media content and email marketing campaigns.",
+        "video_url": "https://example.com/videos/thandiwe_intro.mp4",
+        "resume_url": "https://example.com/resumes/thandiwe_mokwena.pdf",
+        "hourly_rate": 20,
+        "availability": "Available",
+        "english_proficiency": "Native",
+        "timezone": "GMT+2"
+    }
+)
+
+_MOCK_BY_ROLE: Dict[str, Tuple[Dict[str, Any], ...]] = {
+    role: tuple(c for c in _MOCK_CANDIDATES if c['role_category'] == role)
+    for role in {c['role_category'] for c in _MOCK_CANDIDATES}
+}
+
+_MOCK_BY_ID: Dict[str, Dict[str, Any]] = {c['id']: c for c in _MOCK_CANDIDATES}
+
 class CandidateProfile(BaseModel):
     """Candidate profile model"""
     id: str
@@ -28,52 +119,58 @@ class CandidateProfile(BaseModel):
     english_proficiency: str
     timezone: str
 
-@router.get("/", response_model=List[CandidateProfile])
+# Response fields, in order; candidate_listings rows always carry every one of them
+_CANDIDATE_PROFILE_FIELDS = tuple(CandidateProfile.model_fields)
+
+@router.get(
+    "/",
+    response_class=ORJSONResponse,
+    responses={200: {
+        "model": List[CandidateProfile],
+        "content": {NDJSON_MEDIA_TYPE: {}}
+    }}
+)
 async def get_candidate_profiles(
+    request: Request,
     role_category: Optional[str] = Query(None, description="Filter by role category"),
     region: Optional[str] = Query(None, description="Filter by region"),
     max_rate: Optional[int] = Query(None, description="Maximum hourly rate"),
-    limit: int = Query(20, ge=1, le=100, description="Number of candidates to return")
+    limit: int = Query(20, ge=1, le=100, description="Number of candidates to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page")
 ):
     """
-    Get candidate profiles with optional filtering
+    Get candidate profiles with optional filtering.
+    When more results exist, the cursor for the next page is returned in the X-Next-Cursor header.
+    Send `Accept: application/x-ndjson` to receive newline-delimited JSON instead of an array.
     """
     try:
-        # Get candidate profiles from database
-        profiles = await get_database().get_candidate_profiles(role_category=role_category)
-        
-        # Apply additional filters
-        if region:
-            profiles = [p for p in profiles if p.get('region', '').lower() == region.lower()]
+        after = parse_cursor(cursor)
         
-        if max_rate:
-            profiles = [p for p in profiles if p.get('hourly_rate', 0) <= max_rate]
+        # Filters and limit are applied by the database query; one extra row tells us if there is a next page
+        profiles = await cached_db_call(
+            'get_candidate_listings',
+            role_category=role_category,
+            region=region,
+            max_rate=max_rate,
+            limit=limit + 1,
+            after=after
+        )
+        profiles, next_cursor = next_page_cursor(profiles, limit)
         
-        # Limit results
-        profiles = profiles[:limit]
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
         
-        # Convert to response format
-        candidate_list = []
-        for profile in profiles:
-            candidate_list.append(CandidateProfile(
-                id=profile.get('id', ''),
-                name=profile.get('name', ''),
-                role_category=profile.get('role_category', ''),
-                experience_years=profile.get('experience_years', ''),
-                region=profile.get('region', ''),
-                skills=profile.get('skills', []),
-                bio=profile.get('bio', ''),
-                video_url=profile.get('video_url'),
-                resume_url=profile.get('resume_url'),
-                portfolio_url=profile.get('portfolio_url'),
-                hourly_rate=profile.get('hourly_rate'),
-                availability=profile.get('availability', 'Available'),
-                english_proficiency=profile.get('english_proficiency', 'Fluent'),
-                timezone=profile.get('timezone', 'UTC')
-            ))
+        # NDJSON clients get one serialized candidate per line as it is produced
+        if NDJSON_MEDIA_TYPE in (request.headers.get('accept') or ''):
+            return StreamingResponse(
+                (orjson.dumps(candidate_payload(profile)) + b"\n" for profile in profiles),
+                media_type=NDJSON_MEDIA_TYPE,
+                headers=headers
+            )
         
-        return candidate_list
+        return ORJSONResponse([candidate_payload(profile) for profile in profiles], headers=headers)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Failed to get candidate profiles: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve candidates: {str(e)}")
@@ -83,22 +180,14 @@ async def get_candidate_profile(candidate_id: str):
     """
     Get a specific candidate profile by ID
     """
-    try:
-        # In a real implementation, this would fetch from database
-        # For now, return mock data
-        mock_candidates = get_mock_candidates()
-        candidate = next((c for c in mock_candidates if c['id'] == candidate_id), None)
-        
-        if not candidate:
-            raise HTTPException(status_code=404, detail="Candidate not found")
-        
-        return CandidateProfile(**candidate)
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"❌ Failed to get candidate {candidate_id}: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to retrieve candidate: {str(e)}")
+    # In a real implementation, this would fetch from database
+    # For now, return mock data; unexpected errors are handled by the app-wide exception handler
+    candidate = _MOCK_BY_ID.get(candidate_id)
+    
+    if not candidate:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    
+    return candidate
 
 @router.get("/for-role/{role_category}")
 async def get_candidates_for_role(
@@ -109,28 +198,32 @@ async def get_candidates_for_role(
     Get candidate profiles specifically matching a role category
     """
     try:
-        # Get candidates for specific role
-        profiles = await get_database().get_candidate_profiles(role_category=role_category)
+        # Candidates for the role are scored, sorted and limited in the database
+        ranked = await cached_db_call('get_candidates_ranked_for_role', role_category=role_category, limit=limit)
         
-        if not profiles:
-            # Return mock candidates if no data available
-            mock_candidates = get_mock_candidates_for_role(role_category)
-            profiles = mock_candidates[:limit]
+        if ranked:
+            scored_profiles = [(row['matching_score'], row['profile']) for row in ranked]
+        else:
+            # Return mock candidates if no data available, keeping only the top `limit` scores
+            scored_profiles = heapq.nlargest(
+                limit,
+                (
+                    (calculate_role_match_score(profile, role_category), profile)
+                    for profile in get_mock_candidates_for_role(role_category)
+                ),
+                key=itemgetter(0)
+            )
         
-        # Add matching score based on role alignment
         candidates_with_scores = []
-        for profile in profiles[:limit]:
-            matching_score = calculate_role_match_score(profile, role_category)
+        for matching_score, profile in scored_profiles:
+            bio = profile.get('bio') or ''
             candidates_with_scores.append({
                 "candidate": profile,
                 "matching_score": matching_score,
                 "key_strengths": extract_key_strengths(profile, role_category),
-                "experience_highlight": profile.get('bio', '')[:200] + "..." if len(profile.get('bio', '')) > 200 else profile.get('bio', '')
+                "experience_highlight": bio[:200] + "..." if len(bio) > 200 else bio
             })
         
-        # Sort by matching score
-        candidates_with_scores.sort(key=lambda x: x['matching_score'], reverse=True)
-        
         return {
             "role_category": role_category,
             "candidates_found": len(candidates_with_scores),
@@ -145,113 +238,129 @@ async def get_candidates_for_role(
 async def get_candidates_by_region(
     region: str,
     role_category: Optional[str] = Query(None, description="Filter by role"),
-    limit: int = Query(20, ge=1, le=100, description="Number of candidates to return")
+    limit: int = Query(20, ge=1, le=100, description="Number of candidates to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor value from the previous page")
 ):
     """
     Get candidates from a specific region
     """
     try:
-        # Get all candidates and filter by region
-        all_profiles = await get_database().get_candidate_profiles()
-        
-        if not all_profiles:
-            # Return mock data if no database data
-            all_profiles = get_mock_candidates()
-        
-        # Filter by region
-        regional_candidates = [
-            p for p in all_profiles 
-            if p.get('region', '').lower() == region.lower()
-        ]
-        
-        # Additional role filter if specified
-        if role_category:
-            regional_candidates = [
-                p for p in regional_candidates
-                if p.get('role_category', '').lower() == role_category.lower()
-            ]
+        after = parse_cursor(cursor)
         
-        # Limit results
-        regional_candidates = regional_candidates[:limit]
+        # The page and the region-wide aggregates are independent queries, run them together
+        regional_candidates, insights = await asyncio.gather(
+            cached_db_call(
+                'get_candidates_by_region',
+                region=region,
+                role_category=role_category,
+                limit=limit + 1,
+                after=after
+            ),
+            cached_db_call(
+                'get_candidate_region_insights',
+                region=region,
+                role_category=role_category
+            )
+        )
+        regional_candidates, next_cursor = next_page_cursor(regional_candidates, limit)
         
-        # Add regional insights
-        regional_insights = {
-            "region": region,
-            "total_candidates": len(regional_candidates),
-            "average_experience": calculate_average_experience(regional_candidates),
-            "common_skills": get_common_skills(regional_candidates),
-            "salary_range": get_salary_range(regional_candidates),
-            "timezone_info": get_timezone_info(region)
-        }
+        if insights and insights['total_candidates']:
+            regional_insights = {
+                "region": region,
+                "total_candidates": insights['total_candidates'],
+                "average_experience": insights['common_experience'] or "No data",
+                "common_skills": insights['common_skills'] or [],
+                "salary_range": {
+                    "min": insights['rate_min'] or 0,
+                    "max": insights['rate_max'] or 0,
+                    "average": insights['rate_avg'] or 0
+                },
+                "timezone_info": get_timezone_info(region)
+            }
+        else:
+            if not regional_candidates and not after and not await fetch_candidate_profiles(limit=1):
+                # Return mock data if no database data, stopping once limit matches are found
+                region_l = region.lower()
+                role_l = role_category.lower() if role_category else None
+                regional_candidates = list(islice(
+                    (
+                        p for p in get_mock_candidates()
+                        if p.get('region', '').lower() == region_l
+                        and (not role_l or p.get('role_category', '').lower() == role_l)
+                    ),
+                    limit
+                ))
+            
+            # Add regional insights
+            regional_insights = {
+                "region": region,
+                "total_candidates": len(regional_candidates),
+                "average_experience": calculate_average_experience(regional_candidates),
+                "common_skills": get_common_skills(regional_candidates),
+                "salary_range": get_salary_range(regional_candidates),
+                "timezone_info": get_timezone_info(region)
+            }
         
         return {
             "regional_insights": regional_insights,
-            "candidates": regional_candidates
+            "candidates": regional_candidates,
+            "next_cursor": next_cursor
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Failed to get candidates for region {region}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get regional candidates: {str(e)}")
 
 # Helper functions
-def get_mock_candidates() -> List[Dict[str, Any]]:
-    """
-    Mock candidate data for demonstration
-    """
-    return [
-        {
-            "id": "candidate_1",
-            "name": "Maria Santos",
-            "role_category": "Ecommerce Manager",
-            "experience_years": "5-8 years",
-            "region": "Philippines",
-            "skills": ["Shopify Admin", "Google Analytics", "Email Marketing", "Project Management"],
-            "bio": "Experienced e-commerce manager with 6 years of experience managing Shopify stores for US-based brands. Specialized in conversion optimization and customer retention strategies.",
-            "video_url": "https://example.com/videos/maria_intro.mp4",
-            "resume_url": "https://example.com/resumes/maria_santos.pdf",
-            "hourly_rate": 15,
-            "availability": "Available",
-            "english_proficiency": "Fluent",
-            "timezone": "GMT+8"
-        },
-        {
-            "id": "candidate_2", 
-            "name": "Carlos Rodriguez",
-            "role_category": "Data Analyst",
-            "experience_years": "3-6 years",
-            "region": "Latin America",
-            "skills": ["Excel Advanced", "SQL", "Python", "Tableau", "Google Analytics"],
-            "bio": "Data analyst with strong background in e-commerce analytics and reporting. Experience with large datasets and automated reporting systems.",
-            "video_url": "https://example.com/videos/carlos_intro.mp4",
-            "resume_url": "https://example.com/resumes/carlos_rodriguez.pdf",
-            "hourly_rate": 18,
-            "availability": "Available",
-            "english_proficiency": "Advanced",
-            "timezone": "GMT-3"
-        },
-        {
-            "id": "candidate_3",
-            "name": "Thandiwe Mokwena", 
-            "role_category": "Content Marketer",
-            "experience_years": "2-4 years",
-            "region": "South Africa",
-            "skills": ["Content Creation", "Social Media", "SEO", "Adobe Creative Suite"],
-            "bio": "Creative content marketer with experience in B2C brands. Strong background in social media content and email marketing campaigns.",
-            "video_url": "https://example.com/videos/thandiwe_intro.mp4",
-            "resume_url": "https://example.com/resumes/thandiwe_mokwena.pdf",
-            "hourly_rate": 20,
-            "availability": "Available",
-            "english_proficiency": "Native",
-            "timezone": "GMT+2"
-        }
-    ]
+async def cached_db_call(method: str, **filters) -> List[Dict[str, Any]]:
+    """
+    Call a DatabaseManager candidate lookup through the TTL cache.
+    Callers get their own copy of the result list or dict, but the rows in it are shared between
+    requests and must not be mutated.
+    """
+    key = (method,) + tuple(sorted(filters.items()))
+    result = await _candidate_cache.get_or_set(
+        key,
+        lambda: getattr(get_database(), method)(**filters)
+    )
+    return copy.copy(result)
 
-def get_mock_candidates_for_role(role_category: str) -> List[Dict[str, Any]]:
+async def fetch_candidate_profiles(**filters) -> List[Dict[str, Any]]:
+    """
+    Get candidate profiles from the database through the TTL cache
+    """
+    return await cached_db_call('get_candidate_profiles', **filters)
+
+def candidate_payload(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Shape a candidate_listings row as a CandidateProfile response without model validation
+    """
+    return {field: profile[field] for field in _CANDIDATE_PROFILE_FIELDS}
+
+def parse_cursor(cursor: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    Decode a pagination cursor query parameter, rejecting malformed values with a 400
+    """
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+def get_mock_candidates() -> Tuple[Dict[str, Any], ...]:
+    """
+    Mock candidate data for demonstration (shared, do not mutate)
+    """
+    return _MOCK_CANDIDATES
+
+def get_mock_candidates_for_role(role_category: str) -> Tuple[Dict[str, Any], ...]:
     """
     Get mock candidates filtered by role
     """
-    all_candidates = get_mock_candidates()
-    return [c for c in all_candidates if c['role_category'] == role_category]
+    return _MOCK_BY_ROLE.get(role_category, ())
 
 def calculate_role_match_score(candidate: Dict[str, Any], role_category: str) -> float:
     """
@@ -260,12 +369,9 @@ def calculate_role_match_score(candidate: Dict[str, Any], role_category: str) ->
     # Simple scoring based on role match and experience
     base_score = 0.8 if candidate.get('role_category') == role_category else 0.4
     
-    # Boost score based on experience
-    experience = candidate.get('experience_years', '')
-    if '5-8' in experience or '9+' in experience:
-        base_score += 0.15
-    elif '3-6' in experience:
-        base_score += 0.1
+    # Boost score based on the experience band
+    experience = candidate.get('experience_years') or ''
+    base_score += next((bonus for band, bonus in _EXPERIENCE_BONUS if band in experience), 0.0)
     
     return min(base_score, 1.0)
 
@@ -291,36 +397,38 @@ def get_common_skills(candidates: List[Dict[str, Any]]) -> List[str]:
     """
     Get most common skills across candidates
     """
-    skill_counts = {}
-    for candidate in candidates:
-        for skill in candidate.get('skills', []):
-            skill_counts[skill] = skill_counts.get(skill, 0) + 1
-    
-    return sorted(skill_counts.keys(), key=lambda x: skill_counts[x], reverse=True)[:5]
+    skill_counts = Counter(chain.from_iterable(c.get('skills') or () for c in candidates))
+    return [skill for skill, _ in skill_counts.most_common(5)]
 
 def get_salary_range(candidates: List[Dict[str, Any]]) -> Dict[str, int]:
     """
     Get salary range for candidates
     """
-    rates = [c.get('hourly_rate', 0) for c in candidates if c.get('hourly_rate')]
-    if not rates:
+    # Single pass over the candidates; missing or zero rates are skipped
+    count = total = 0
+    min_rate = max_rate = None
+    for candidate in candidates:
+        rate = candidate.get('hourly_rate')
+        if not rate:
+            continue
+        count += 1
+        total += rate
+        if min_rate is None or rate < min_rate:
+            min_rate = rate
+        if max_rate is None or rate > max_rate:
+            max_rate = rate
+    
+    if not count:
         return {"min": 0, "max": 0, "average": 0}
     
     return {
-        "min": min(rates),
-        "max": max(rates),
-        "average": sum(rates) // len(rates)
+        "min": min_rate,
+        "max": max_rate,
+        "average": total // count
     }
 
 def get_timezone_info(region: str) -> str:
     """
     Get timezone information for region
     """
-    timezone_map = {
-        "Philippines": "GMT+8 (Manila) - Good overlap with US West Coast",
-        "Latin America": "GMT-3 to GMT-5 - Excellent overlap with US time zones", 
-        "South Africa": "GMT+2 (Cape Town) - Good overlap with European hours",
-        "United States": "Various time zones - Local talent"
-    }
-    
-    return timezone_map.get(region, "Contact for specific timezone information")
\ No newline at end of file
+    return _TIMEZONE_MAP.get(region, "Contact for specific timezone information")
@@ -3,19 +3,98 @@ CSV Export API endpoints for Canva template integration
 Generates all 134 template variables for Market Scan PDFs
 """
 
-import csv
-import io
+import asyncio
 import uuid
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-from fastapi import APIRouter, HTTPException, Query, Response
+from functools import lru_cache
+from itertools import islice
+from types import MappingProxyType
+from typing import List, Dict, Any, Optional, Iterable, Iterator, AsyncIterator, Tuple
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from loguru import logger
 
+from app.core.cache import TTLCache
+from app.core.csv_lines import csv_line_writer
 from app.core.database import get_database
 from app.models.market_scan import MarketScanResponse
 
 router = APIRouter()
 
+# Mock candidate data for template generation, built once at import
+_MOCK_CANDIDATES: Tuple[Dict[str, Any], ...] = (
+    {
+        "name": "Ana",
+        "role_category": "Content Marketer",
+        "region": "Philippines",
+        "country_code": "PHL",
+        "monthly_salary_min": 1500,
+        "monthly_salary_max": 2000,
+        "onboarded_date": "2024-02-04",
+        "capabilities": "A dynamic Content Marketer based in the Philippines with 6+ years of experience...",
+        "responsibilities": "• Develop and implement content strategies\n• Create written and visual content\n• Analyze performance to refine content",
+        "experience_breakdown": {"freelancing": "6+ Yrs", "content_marketing": "6+ Yrs", "adobe_suite": "10+ Yrs"},
+        "tech_stack": {"primary": ["Meta Ads Manager", "Shopify"], "secondary": ["Landing Page Creation", "Influencer Marketing"]},
+        "video_url": None
+    },
+    {
+        "name": "Natália",
+        "role_category": "Copywriter & Content",
+        "region": "Brazil",
+        "country_code": "BRA",
+        "monthly_salary_min": 2000,
+        "monthly_salary_max": 2500,
+        "onboarded_date": None,
+        "capabilities": "Has 8+ years of experience creating multifaceted content for brands...",
+        "responsibilities": "• Create visual content that aligns with brand guidelines\n• Design assets for various mediums\n• Collaborate with teams",
+        "experience_breakdown": {"freelancing": "5+ Yrs", "content_marketing": "8+ Yrs", "adobe_suite": "10+ Yrs"},
+        "tech_stack": {"primary": ["Adobe Creative Suite", "Figma"], "secondary": ["Video Editing", "Copywriting"]},
+        "video_url": None
+    },
+    {
+        "name": "Sarah",
+        "role_category": "Marketing Specialist",
+        "region": "South Africa",
+        "country_code": "ZAF",
+        "monthly_salary_min": 1800,
+        "monthly_salary_max": 2200,
+        "onboarded_date": None,
+        "capabilities": "Experienced marketing professional based in South Africa...",
+        "responsibilities": "• Develop comprehensive marketing strategies\n• Execute cross-channel campaigns\n• Optimize performance metrics",
+        "experience_breakdown": {"marketing": "5+ Yrs", "digital_strategy": "3+ Yrs", "analytics": "7+ Yrs"},
+        "tech_stack": {"primary": ["Google Analytics", "HubSpot"], "secondary": ["Social Media Management", "Email Marketing"]},
+        "video_url": None
+    }
+)
+
+# Template candidates are reused across exports for a minute
+TEMPLATE_CANDIDATE_CACHE_TTL_SECONDS = 60
+_template_candidate_cache = TTLCache(maxsize=1, ttl=TEMPLATE_CANDIDATE_CACHE_TTL_SECONDS)
+
+# Rendered CSV rows per export, reused while the scan and template candidates are unchanged
+CSV_CACHE_TTL_SECONDS = 3600
+_csv_rows_cache = TTLCache(maxsize=128, ttl=CSV_CACHE_TTL_SECONDS)
+
+# Must-have skills containing any of these are listed as analytics skills
+_ANALYTICS_SKILL_WORDS = ('analytics', 'data', 'report')
+
+# Template variables that are the same for every export
+_SIMILAR_ROLES = MappingProxyType({
+    "similar_role_1": "E-commerce Analyst",
+    "similar_role_1_percent": "45",
+    "similar_role_2": "Marketing Data Analyst",
+    "similar_role_2_percent": "25",
+    "similar_role_3": "Business Intelligence Analyst",
+    "similar_role_3_percent": "20"
+})
+
+_REGIONAL_RECOMMENDATIONS = MappingProxyType({
+    "asia_recommendation": "High skill availability, excellent English proficiency",
+    "latam_recommendation": "Strong technical skills, overlapping US timezone",
+    "africa_recommendation": "Growing tech talent pool, cost-effective rates",
+    "europe_recommendation": "Premium talent, higher costs but excellent quality"
+})
+
 @router.get("/market-scans/{scan_id}")
 async def export_market_scan_csv(
     scan_id: str,
@@ -25,26 +104,28 @@ async def export_market_scan_csv(
     Export market scan data as CSV with all 134 template variables for Canva integration
     """
     try:
-        # Get market scan data
-        scan_data = await get_database().get_market_scan(scan_id)
+        # The scan and the template candidates are independent lookups, fetch them together
+        scan_data, candidates = await asyncio.gather(
+            get_database().get_market_scan(scan_id),
+            get_candidate_profiles_for_template()
+        )
         if not scan_data:
             raise HTTPException(status_code=404, detail="Market scan not found")
         
-        # Get candidate profiles from database
-        candidates = await get_candidate_profiles_for_template()
-        
-        # Generate template variables
-        template_data = generate_template_variables(scan_data, candidates)
-        
-        # Create CSV
-        csv_content = create_csv_content(template_data)
-        
-        logger.info(f"✅ Generated CSV export for market scan {scan_id} with {len(template_data)} variables")
+        # Re-downloads of an unchanged scan on the same day reuse the rendered rows
+        cache_key = csv_cache_key(scan_id, scan_data, candidates)
+        csv_rows = _csv_rows_cache.get(cache_key)
+        if csv_rows is None:
+            # Generating and encoding the variables is pure CPU work, keep it off the event loop
+            csv_rows = await asyncio.to_thread(render_csv_rows, scan_data, candidates)
+            _csv_rows_cache.set(cache_key, csv_rows)
+            
+            logger.info(f"✅ Generated CSV export for market scan {scan_id} with {len(csv_rows) - 1} variables")
         
-        # Return CSV as downloadable file
+        # Stream the CSV as a downloadable file, one row at a time
         filename = f"market_scan_{scan_id}_template.csv"
-        return Response(
-            content=csv_content,
+        return StreamingResponse(
+            iter_csv(csv_rows),
             media_type="text/csv",
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
@@ -55,83 +136,41 @@ async def export_market_scan_csv(
         logger.error(f"❌ Failed to export market scan {scan_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to export market scan: {str(e)}")
 
+def csv_cache_key(scan_id: str, scan_data: Dict[str, Any], candidates: List[Dict[str, Any]]) -> Tuple:
+    """
+    Key an export on everything its rows depend on: the scan version, the template
+    candidates and the current date (the template includes the scan date)
+    """
+    return (
+        scan_id,
+        scan_data.get('updated_at'),
+        tuple((c.get('id'), c.get('updated_at')) for c in candidates),
+        datetime.utcnow().date()
+    )
+
 async def get_candidate_profiles_for_template() -> List[Dict[str, Any]]:
-    """Get candidate profiles for template generation"""
+    """Get candidate profiles for template generation (shared, do not mutate)"""
     try:
-        # Get 3 candidates from different regions for template profiles
-        candidates = await get_database().get_candidate_profiles()
+        # The selection rarely changes between exports, so reuse it for a short while
+        candidates = await _template_candidate_cache.get_or_set(
+            'template_candidates',
+            select_template_candidates
+        )
         
-        if candidates and len(candidates) >= 3:
-            # Get candidates from different regions if possible
-            regions_seen = set()
-            selected_candidates = []
-            
-            for candidate in candidates:
-                if len(selected_candidates) >= 3:
-                    break
-                    
-                region = candidate.get('region', 'Unknown')
-                if region not in regions_seen or len(selected_candidates) < 3:
-                    selected_candidates.append(candidate)
-                    regions_seen.add(region)
-                    
-            return selected_candidates[:3]
-        elif candidates:
-            return candidates[:3]
-        else:
-            # Return mock candidates if none in database
-            return get_mock_candidates()
+        # Return mock candidates if none in database (not cached, so the database is retried)
+        return candidates or get_mock_candidates()
             
     except Exception as e:
         logger.warning(f"Failed to fetch candidates from database: {e}, using mock data")
         return get_mock_candidates()
 
-def get_mock_candidates() -> List[Dict[str, Any]]:
-    """Get mock candidate data for template generation"""
-    return [
-        {
-            "name": "Ana",
-            "role_category": "Content Marketer",
-            "region": "Philippines",
-            "country_code": "PHL",
-            "monthly_salary_min": 1500,
-            "monthly_salary_max": 2000,
-            "onboarded_date": "2024-02-04",
-            "capabilities": "A dynamic Content Marketer based in the Philippines with 6+ years of experience...",
-            "responsibilities": "• Develop and implement content strategies\n• Create written and visual content\n• Analyze performance to refine content",
-            "experience_breakdown": {"freelancing": "6+ Yrs", "content_marketing": "6+ Yrs", "adobe_suite": "10+ Yrs"},
-            "tech_stack": {"primary": ["Meta Ads Manager", "Shopify"], "secondary": ["Landing Page Creation", "Influencer Marketing"]},
-            "video_url": None
-        },
-        {
-            "name": "Natália",
-            "role_category": "Copywriter & Content",
-            "region": "Brazil",
-            "country_code": "BRA",
-            "monthly_salary_min": 2000,
-            "monthly_salary_max": 2500,
-            "onboarded_date": None,
-            "capabilities": "Has 8+ years of experience creating multifaceted content for brands...",
-            "responsibilities": "• Create visual content that aligns with brand guidelines\n• Design assets for various mediums\n• Collaborate with teams",
-            "experience_breakdown": {"freelancing": "5+ Yrs", "content_marketing": "8+ Yrs", "adobe_suite": "10+ Yrs"},
-            "tech_stack": {"primary": ["Adobe Creative Suite", "Figma"], "secondary": ["Video Editing", "Copywriting"]},
-            "video_url": None
-        },
-        {
-            "name": "Sarah",
-            "role_category": "Marketing Specialist",
-            "region": "South Africa",
-            "country_code": "ZAF",
-            "monthly_salary_min": 1800,
-            "monthly_salary_max": 2200,
-            "onboarded_date": None,
-            "capabilities": "Experienced marketing professional based in South Africa...",
-            "responsibilities": "• Develop comprehensive marketing strategies\n• Execute cross-channel campaigns\n• Optimize performance metrics",
-            "experience_breakdown": {"marketing": "5+ Yrs", "digital_strategy": "3+ Yrs", "analytics": "7+ Yrs"},
-            "tech_stack": {"primary": ["Google Analytics", "HubSpot"], "secondary": ["Social Media Management", "Email Marketing"]},
-            "video_url": None
-        }
-    ]
+async def select_template_candidates() -> List[Dict[str, Any]]:
+    """Pick up to 3 database candidates for the template, from different regions where possible"""
+    return await get_database().get_region_diverse_candidates(limit=3)
+
+def get_mock_candidates() -> Tuple[Dict[str, Any], ...]:
+    """Get mock candidate data for template generation (shared, do not mutate)"""
+    return _MOCK_CANDIDATES
 
 def generate_template_variables(scan_data: Dict[str, Any], candidates: List[Dict[str, Any]]) -> Dict[str, str]:
     """Generate all 134 template variables for Canva integration"""
@@ -147,135 +186,144 @@ def generate_template_variables(scan_data: Dict[str, Any], candidates: List[Dict
     # Get current date for scan_date
     scan_date = datetime.utcnow().strftime("%B %d, %Y")
     
-    # Build template variables dictionary
-    variables = {}
-    
-    # === Company & Role Information ===
-    variables.update({
-        "company_name": scan_data.get('company_domain', ''),
-        "position_title": scan_data.get('job_title', ''),
-        "scan_date": scan_date,
-        "analysis_confidence": f"{int((scan_data.get('confidence_score', 0.8) * 100))}%"
-    })
-    
-    # === Salary Data - All Regions ===
-    
-    # United States (Baseline)
+    # Regional salary bands, with defaults when the scan has no recommendation for a region
     us_salary = salary_data.get('United States', {})
-    variables.update({
-        "us_salary": format_salary(us_salary.get('mid', 95000)),
-        "us_salary_min": format_salary(us_salary.get('low', 75000)),
-        "us_salary_max": format_salary(us_salary.get('high', 120000))
-    })
-    
-    # Philippines (High Savings)
+    us_mid = us_salary.get('mid', 95000)
     ph_salary = salary_data.get('Philippines', {})
-    ph_mid = ph_salary.get('mid', 28000)
-    variables.update({
-        "ph_salary": format_salary(ph_mid),
-        "ph_salary_min": format_salary(ph_salary.get('low', 22000)),
-        "ph_salary_max": format_salary(ph_salary.get('high', 35000)),
-        "ph_savings_percent": f"{calculate_savings_percent(us_salary.get('mid', 95000), ph_mid)}%"
-    })
-    
-    # Latin America
+    # Philippines values are read once; the template uses different defaults for the
+    # regional band and for the recommended range / pricing base
+    ph_low, ph_mid_value, ph_high = ph_salary.get('low'), ph_salary.get('mid'), ph_salary.get('high')
+    ph_mid = 28000 if ph_mid_value is None else ph_mid_value
     latam_salary = salary_data.get('Latin America', {})
     latam_mid = latam_salary.get('mid', 52000)
-    variables.update({
+    sa_salary = salary_data.get('South Africa', {})
+    sa_mid = sa_salary.get('mid', 45000)
+    eu_mid = 75000  # Estimated Europe salary
+    
+    must_have = job_analysis.get('must_have_skills', [])
+    nice_to_have = job_analysis.get('nice_to_have_skills', [])
+    must_have_lower = [(skill, skill.lower()) for skill in must_have]
+    market_insights = salary_recommendations.get('market_insights', {})
+    base_salary = 2000 if ph_mid_value is None else ph_mid_value
+    # Monthly base salary multiples shared by the breakdown, pricing and comparison variables
+    base_salary_07 = int(base_salary * 0.7)
+    base_salary_08 = int(base_salary * 0.8)
+    base_salary_10 = int(base_salary * 1.0)
+    base_salary_20 = int(base_salary * 2.0)
+    annual_cost_k = int(base_salary * 12 / 1000)
+    company_domain = scan_data.get('company_domain') or ''
+    job_title = scan_data.get('job_title') or ''
+    
+    # Build every scan-derived template variable in a single dictionary
+    variables = {
+        # === Company & Role Information ===
+        "company_name": company_domain,
+        "position_title": job_title,
+        "scan_date": scan_date,
+        "analysis_confidence": f"{int((scan_data.get('confidence_score', 0.8) * 100))}%",
+        
+        # === Salary Data - All Regions ===
+        # United States (Baseline)
+        "us_salary": format_salary(us_mid),
+        "us_salary_min": format_salary(us_salary.get('low', 75000)),
+        "us_salary_max": format_salary(us_salary.get('high', 120000)),
+        # Philippines (High Savings)
+        "ph_salary": format_salary(ph_mid),
+        "ph_salary_min": format_salary(22000 if ph_low is None else ph_low),
+        "ph_salary_max": format_salary(35000 if ph_high is None else ph_high),
+        "ph_savings_percent": f"{calculate_savings_percent(us_mid, ph_mid)}%",
+        # Latin America
         "latam_salary": format_salary(latam_mid),
         "latam_salary_min": format_salary(latam_salary.get('low', 40000)),
         "latam_salary_max": format_salary(latam_salary.get('high', 65000)),
-        "latam_savings_percent": f"{calculate_savings_percent(us_salary.get('mid', 95000), latam_mid)}%"
-    })
-    
-    # South Africa
-    sa_salary = salary_data.get('South Africa', {})
-    sa_mid = sa_salary.get('mid', 45000)
-    variables.update({
+        "latam_savings_percent": f"{calculate_savings_percent(us_mid, latam_mid)}%",
+        # South Africa
         "sa_salary": format_salary(sa_mid),
         "sa_salary_min": format_salary(sa_salary.get('low', 35000)),
         "sa_salary_max": format_salary(sa_salary.get('high', 58000)),
-        "sa_savings_percent": f"{calculate_savings_percent(us_salary.get('mid', 95000), sa_mid)}%"
-    })
-    
-    # Europe
-    eu_mid = 75000  # Estimated Europe salary
-    variables.update({
+        "sa_savings_percent": f"{calculate_savings_percent(us_mid, sa_mid)}%",
+        # Europe
         "europe_salary_min": format_salary(65000),
         "europe_salary_max": format_salary(85000),
-        "europe_savings_percent": f"{calculate_savings_percent(us_salary.get('mid', 95000), eu_mid)}%"
-    })
-    
-    # === Skills & Requirements ===
-    must_have = job_analysis.get('must_have_skills', [])
-    nice_to_have = job_analysis.get('nice_to_have_skills', [])
-    
-    variables.update({
-        "required_skills": ", ".join(must_have[:5]) if must_have else "Industry-specific skills",
-        "preferred_skills": ", ".join(nice_to_have[:5]) if nice_to_have else "Additional technical skills",
+        "europe_savings_percent": f"{calculate_savings_percent(us_mid, eu_mid)}%",
+        
+        # === Skills & Requirements ===
+        "required_skills": ", ".join(islice(must_have, 5)) if must_have else "Industry-specific skills",
+        "preferred_skills": ", ".join(islice(nice_to_have, 5)) if nice_to_have else "Additional technical skills",
         "certifications": "Industry certification, Relevant online courses",
-        "tech_skills": ", ".join(must_have[:3]) if must_have else "Technical platforms",
-        "marketing_skills": ", ".join([s for s in must_have if 'marketing' in s.lower()][:3]) or "Marketing tools",
-        "analytics_skills": ", ".join([s for s in must_have if any(word in s.lower() for word in ['analytics', 'data', 'report'])][:3]) or "Analytics platforms"
-    })
-    
-    # === Job Analysis ===
-    variables.update({
+        "tech_skills": ", ".join(islice(must_have, 3)) if must_have else "Technical platforms",
+        "marketing_skills": ", ".join(islice((s for s, ls in must_have_lower if 'marketing' in ls), 3)) or "Marketing tools",
+        "analytics_skills": ", ".join(islice((s for s, ls in must_have_lower if any(word in ls for word in _ANALYTICS_SKILL_WORDS)), 3)) or "Analytics platforms",
+        
+        # === Job Analysis ===
         "role_complexity": str(job_analysis.get('complexity_score', 7)),
         "seniority_level": job_analysis.get('experience_level', 'mid'),
         "experience_years": job_analysis.get('years_experience_required', '3-5 years'),
         "remote_suitability": job_analysis.get('remote_work_suitability', 'High').title(),
         "best_regions": ", ".join(job_analysis.get('recommended_regions', ['Philippines', 'Latin America'])),
-        "main_duties": "; ".join(job_analysis.get('key_responsibilities', ['Manage operations', 'Analyze performance'])[:3]),
-        "role_challenges": job_analysis.get('unique_challenges', 'Complex project coordination and performance optimization')
-    })
-    
-    # === Market Insights ===
-    market_insights = salary_recommendations.get('market_insights', {})
-    variables.update({
+        "main_duties": "; ".join(islice(job_analysis.get('key_responsibilities', ['Manage operations', 'Analyze performance']), 3)),
+        "role_challenges": job_analysis.get('unique_challenges', 'Complex project coordination and performance optimization'),
+        
+        # === Market Insights ===
         "high_demand_regions": market_insights.get('high_demand_regions', ['United States', 'Philippines']),
         "competitive_factors": ", ".join(market_insights.get('competitive_factors', ['Experience', 'Technical skills'])),
         "cost_efficiency": market_insights.get('cost_efficiency', 'Philippines offers best value for this role'),
-        "salary_factors": ", ".join(job_analysis.get('salary_factors', ['Experience level', 'Technical expertise', 'Industry knowledge']))
-    })
-    
-    # === Similar Roles Data ===
-    variables.update({
-        "similar_role_1": "E-commerce Analyst",
-        "similar_role_1_percent": "45",
-        "similar_role_2": "Marketing Data Analyst", 
-        "similar_role_2_percent": "25",
-        "similar_role_3": "Business Intelligence Analyst",
-        "similar_role_3_percent": "20"
-    })
-    
-    # === Experience Level Breakdowns ===
-    base_salary = ph_salary.get('mid', 2000)
-    variables.update({
+        "salary_factors": ", ".join(job_analysis.get('salary_factors', ['Experience level', 'Technical expertise', 'Industry knowledge'])),
+        
+        # === Similar Roles Data ===
+        **_SIMILAR_ROLES,
+        
+        # === Experience Level Breakdowns ===
         "junior_salary_min": format_salary(int(base_salary * 0.6)),
-        "junior_salary_max": format_salary(int(base_salary * 0.8)),
-        "mid_salary_min": format_salary(int(base_salary * 0.8)),
-        "mid_salary_max": format_salary(int(base_salary * 1.0)),
-        "senior_salary_min": format_salary(int(base_salary * 1.0)),
+        "junior_salary_max": format_salary(base_salary_08),
+        "mid_salary_min": format_salary(base_salary_08),
+        "mid_salary_max": format_salary(base_salary_10),
+        "senior_salary_min": format_salary(base_salary_10),
         "senior_salary_max": format_salary(int(base_salary * 1.3)),
         "expert_salary_min": format_salary(int(base_salary * 1.3)),
-        "expert_salary_max": format_salary(int(base_salary * 1.6))
-    })
-    
-    # === Regional Recommendations ===
-    variables.update({
-        "asia_recommendation": "High skill availability, excellent English proficiency",
-        "latam_recommendation": "Strong technical skills, overlapping US timezone", 
-        "africa_recommendation": "Growing tech talent pool, cost-effective rates",
-        "europe_recommendation": "Premium talent, higher costs but excellent quality"
-    })
-    
-    # === Additional Variables ===
-    variables.update({
-        "client_logo_url": f"https://{scan_data.get('company_domain', 'client.com')}/logo.png",
-        "recommended_salary_min": format_salary(ph_salary.get('low', 1800)),
-        "recommended_salary_max": format_salary(ph_salary.get('high', 2300))
-    })
+        "expert_salary_max": format_salary(int(base_salary * 1.6)),
+        
+        # === Regional Recommendations ===
+        **_REGIONAL_RECOMMENDATIONS,
+        
+        # === Additional Variables ===
+        "client_logo_url": f"https://{company_domain or 'client.com'}/logo.png",
+        "recommended_salary_min": format_salary(1800 if ph_low is None else ph_low),
+        "recommended_salary_max": format_salary(2300 if ph_high is None else ph_high),
+        
+        # === Pricing & Service Structure ===
+        "tier_1_salary_range": f"${base_salary_07} - ${base_salary_10}",
+        "tier_1_regions": "Philippines",
+        "tier_1_fee": "$4,800",
+        "tier_2_salary_range": f"${int(base_salary * 1.2)} - ${base_salary_20}",
+        "tier_2_regions": "Philippines + Latin America",
+        "tier_2_fee": "$5,600",
+        "tier_3_salary_range": f"${base_salary_20}+",
+        "tier_3_regions": "PI + LatAm + Africa + EU",
+        "tier_3_fee": "$6,400 - $8,000",
+        
+        # === Project Summary ===
+        "project_role": job_title or 'Specialist',
+        "project_salary_range": f"${base_salary_08} - ${base_salary_10}",
+        "project_fee_total": "$5,600 Total",
+        "project_fee_deposit": "$1,500 deposit due now",
+        "project_fee_balance": "Balance Due after successful placement",
+        "project_guarantee": "Culture fit, performance, life events- we'll replace them free of charge",
+        
+        # === Service Comparison (BPO vs Tidal) ===
+        "bpo_agency_cost": "$3K / month",
+        "bpo_agency_annual": "$36K / year",
+        "bpo_hire_gets": f"${base_salary_07}/month → ${int(base_salary * 0.7 * 12)}K / Year",
+        "bpo_results": "Less quality talent.\nBPO is squeezing recurring revenue monthly\nAdded layer of middle-management & stakeholders",
+        "tidal_fee": "$5,600 one-time fee",
+        "tidal_monthly_cost": f"${int(base_salary / 1000)}K / month",
+        "tidal_annual_cost": f"${annual_cost_k}K / year",
+        "tidal_hire_gets": f"${int(base_salary)}/month → ${annual_cost_k}K / Year",
+        "tidal_results": "Attract better candidates.\nPay people the most & retain talent longer\nTidal only gets paid when we perform",
+        "fixed_budget_example": f"${annual_cost_k}K/year",
+        "tidal_salary_option_1": f"Hire @ ${base_salary_08} / month → ${int(base_salary * 0.8 * 12 / 1000)}K / year",
+        "tidal_salary_option_2": "Deel COR @ $500 / month → $6K / year"
+    }
     
     # === Candidate Profiles ===
     add_candidate_variables(variables, candidates)
@@ -285,15 +333,6 @@ def generate_template_variables(scan_data: Dict[str, Any], candidates: List[Dict
         featured = candidates[0]  # Use first candidate as featured
         add_featured_candidate_variables(variables, featured)
     
-    # === Pricing & Service Structure ===
-    add_pricing_variables(variables, base_salary)
-    
-    # === Project Summary ===
-    add_project_summary_variables(variables, scan_data, base_salary)
-    
-    # === Service Comparison ===
-    add_service_comparison_variables(variables, base_salary)
-    
     return variables
 
 def add_candidate_variables(variables: Dict[str, str], candidates: List[Dict[str, Any]]):
@@ -320,7 +359,7 @@ def add_candidate_variables(variables: Dict[str, str], candidates: List[Dict[str
             f"{prefix}experience_1": exp_list[0] if len(exp_list) > 0 else "5+ Yrs Experience",
             f"{prefix}experience_2": exp_list[1] if len(exp_list) > 1 else "3+ Yrs Specialization",
             f"{prefix}experience_3": exp_list[2] if len(exp_list) > 2 else "Professional Development",
-            f"{prefix}tech_stack": "\n".join(tech_list[:4]) if tech_list else "Industry-standard tools\nPlatform expertise\nAnalytics software\nCollaboration tools"
+            f"{prefix}tech_stack": "\n".join(islice(tech_list, 4)) if tech_list else "Industry-standard tools\nPlatform expertise\nAnalytics software\nCollaboration tools"
         })
 
 def add_featured_candidate_variables(variables: Dict[str, str], candidate: Dict[str, Any]):
@@ -329,6 +368,17 @@ def add_featured_candidate_variables(variables: Dict[str, str], candidate: Dict[
     tech_stack = candidate.get('tech_stack') or {}
     tech_list = (tech_stack.get('primary', []) + tech_stack.get('secondary', [])) if tech_stack else []
     
+    # One pass over the experience breakdown, keeping the first entry of each kind
+    experience_freelance = experience_content = experience_adobe = None
+    for k, v in exp_breakdown.items():
+        lk = k.lower()
+        if experience_freelance is None and 'freelanc' in lk:
+            experience_freelance = f"{v} Freelancing"
+        if experience_content is None and ('content' in lk or 'marketing' in lk or 'creative' in lk):
+            experience_content = f"{v} {k.replace('_', ' ').title()}"
+        if experience_adobe is None and 'adobe' in lk:
+            experience_adobe = f"{v} Adobe Suite"
+    
     variables.update({
         "featured_candidate_name": candidate.get('name', 'Featured Candidate'),
         "featured_candidate_photo_url": candidate.get('video_url') or f"https://example.com/{candidate.get('name', 'featured').lower()}.jpg",
@@ -337,9 +387,9 @@ def add_featured_candidate_variables(variables: Dict[str, str], candidate: Dict[
         "featured_candidate_region": candidate.get('region', 'Philippines'),
         "featured_candidate_salary_range": f"${candidate.get('monthly_salary_min', 2000)}-${candidate.get('monthly_salary_max', 2500)}",
         "featured_candidate_onboarded": format_date(candidate.get('onboarded_date')) or "NA",
-        "featured_candidate_experience_freelance": next((f"{v} Freelancing" for k, v in exp_breakdown.items() if 'freelanc' in k.lower()), "5+ Yrs Freelancing"),
-        "featured_candidate_experience_content": next((f"{v} {k.replace('_', ' ').title()}" for k, v in exp_breakdown.items() if any(word in k.lower() for word in ['content', 'marketing', 'creative'])), "3+ Yrs Content Marketing"),
-        "featured_candidate_experience_adobe": next((f"{v} Adobe Suite" for k, v in exp_breakdown.items() if 'adobe' in k.lower()), "5+ Yrs Adobe Suite"),
+        "featured_candidate_experience_freelance": experience_freelance or "5+ Yrs Freelancing",
+        "featured_candidate_experience_content": experience_content or "3+ Yrs Content Marketing",
+        "featured_candidate_experience_adobe": experience_adobe or "5+ Yrs Adobe Suite",
         "featured_candidate_tech_1": tech_list[0] if len(tech_list) > 0 else "Primary Platform",
         "featured_candidate_tech_2": tech_list[1] if len(tech_list) > 1 else "Design Tools",
         "featured_candidate_tech_3": tech_list[2] if len(tech_list) > 2 else "Analytics",
@@ -347,93 +397,85 @@ def add_featured_candidate_variables(variables: Dict[str, str], candidate: Dict[
         "featured_candidate_responsibilities": candidate.get('responsibilities', '• Lead strategic initiatives\n• Manage client relationships\n• Optimize performance metrics')
     })
 
-def add_pricing_variables(variables: Dict[str, str], base_salary: int):
-    """Add pricing tier variables"""
-    variables.update({
-        "tier_1_salary_range": f"${int(base_salary * 0.7)} - ${int(base_salary * 1.0)}",
-        "tier_1_regions": "Philippines",
-        "tier_1_fee": "$4,800",
-        "tier_2_salary_range": f"${int(base_salary * 1.2)} - ${int(base_salary * 2.0)}",
-        "tier_2_regions": "Philippines + Latin America",
-        "tier_2_fee": "$5,600",
-        "tier_3_salary_range": f"${int(base_salary * 2.0)}+",
-        "tier_3_regions": "PI + LatAm + Africa + EU",
-        "tier_3_fee": "$6,400 - $8,000"
-    })
-
-def add_project_summary_variables(variables: Dict[str, str], scan_data: Dict[str, Any], base_salary: int):
-    """Add project summary variables"""
-    variables.update({
-        "project_role": scan_data.get('job_title', 'Specialist'),
-        "project_salary_range": f"${int(base_salary * 0.8)} - ${int(base_salary * 1.0)}",
-        "project_fee_total": "$5,600 Total",
-        "project_fee_deposit": "$1,500 deposit due now",
-        "project_fee_balance": "Balance Due after successful placement",
-        "project_guarantee": "Culture fit, performance, life events- we'll replace them free of charge"
-    })
-
-def add_service_comparison_variables(variables: Dict[str, str], base_salary: int):
-    """Add service comparison variables (BPO vs Tidal)"""
-    annual_cost = base_salary * 12
-    
-    variables.update({
-        "bpo_agency_cost": "$3K / month",
-        "bpo_agency_annual": "$36K / year",
-        "bpo_hire_gets": f"${int(base_salary * 0.7)}/month → ${int(base_salary * 0.7 * 12)}K / Year",
-        "bpo_results": "Less quality talent.\nBPO is squeezing recurring revenue monthly\nAdded layer of middle-management & stakeholders",
-        "tidal_fee": "$5,600 one-time fee",
-        "tidal_monthly_cost": f"${int(base_salary / 1000)}K / month",
-        "tidal_annual_cost": f"${int(annual_cost / 1000)}K / year",
-        "tidal_hire_gets": f"${int(base_salary)}/month → ${int(annual_cost / 1000)}K / Year",
-        "tidal_results": "Attract better candidates.\nPay people the most & retain talent longer\nTidal only gets paid when we perform",
-        "fixed_budget_example": f"${int(annual_cost / 1000)}K/year",
-        "tidal_salary_option_1": f"Hire @ ${int(base_salary * 0.8)} / month → ${int(base_salary * 0.8 * 12 / 1000)}K / year",
-        "tidal_salary_option_2": "Deel COR @ $500 / month → $6K / year"
-    })
+# Zero-padded groups for the thousands separator fast path in format_salary
+_THOUSAND_STR = tuple(f"{i:03d}" for i in range(1000))
 
+# Pure and called with a small set of amounts (mostly defaults); typed so 1000 and 1000.0
+# keep their distinct formatting
+@lru_cache(maxsize=512, typed=True)
 def format_salary(amount: int) -> str:
     """Format salary amount with appropriate formatting"""
+    if type(amount) is int and 1000 <= amount < 1_000_000:
+        # Salaries are almost always in this range, group the thousands without format()
+        thousands, remainder = divmod(amount, 1000)
+        return f"${thousands},{_THOUSAND_STR[remainder]}"
     if amount >= 1000:
         return f"${amount:,}"
     else:
         return f"${amount}"
 
+@lru_cache(maxsize=512)
 def calculate_savings_percent(us_salary: int, other_salary: int) -> int:
     """Calculate savings percentage vs US salary"""
     if us_salary <= 0:
         return 0
     return int(((us_salary - other_salary) / us_salary) * 100)
 
+@lru_cache(maxsize=256)
 def format_date(date_str: Optional[str]) -> str:
     """Format date string for display"""
     if not date_str:
         return "NA"
+    if not isinstance(date_str, str):
+        return str(date_str)
     
     try:
-        # Parse different date formats
-        if isinstance(date_str, str):
-            if "T" in date_str:  # ISO format
-                dt = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
-            else:  # Simple date format
-                dt = datetime.strptime(date_str, "%Y-%m-%d")
-            return dt.strftime("%m/%d/%Y")
-    except:
-        pass
-    
-    return str(date_str)
+        if "T" in date_str:  # ISO format; only the date part is displayed, so a UTC "Z" can be dropped
+            dt = datetime.fromisoformat(date_str[:-1] if date_str[-1] == "Z" else date_str)
+        else:  # Simple date format
+            dt = datetime.strptime(date_str, "%Y-%m-%d")
+        return dt.strftime("%m/%d/%Y")
+    except (ValueError, TypeError):
+        return date_str
 
-def create_csv_content(template_data: Dict[str, str]) -> str:
-    """Create CSV content from template data"""
-    output = io.StringIO()
-    writer = csv.writer(output)
+# Line feeds in template values are written as literal \n escapes
+_LINE_BREAK_ESCAPES = str.maketrans({'\n': '\\n'})
+
+def iter_csv_rows(template_data: Dict[str, str]) -> Iterator[str]:
+    """Yield the two-column template CSV one encoded row at a time"""
+    writer = csv_line_writer()
     
-    # Write header
-    writer.writerow(['Variable', 'Value'])
+    # Header
+    yield writer.writerow(('Variable', 'Value'))
     
-    # Write all template variables
-    for key, value in sorted(template_data.items()):
-        # Clean value for CSV (handle newlines)
-        clean_value = str(value).replace('\n', '\\n') if value else ''
-        writer.writerow([key, clean_value])
+    # All template variables, in key order; full template exports reuse the precomputed order
+    if template_data.keys() == _TEMPLATE_KEY_SET:
+        keys = _SORTED_TEMPLATE_KEYS
+    else:
+        keys = sorted(template_data)
     
-    return output.getvalue()
\ No newline at end of file
+    for key in keys:
+        value = template_data[key]
+        # Clean value for CSV (escape line breaks)
+        clean_value = str(value).translate(_LINE_BREAK_ESCAPES) if value else ''
+        yield writer.writerow((key, clean_value))
+
+def render_csv_rows(scan_data: Dict[str, Any], candidates: List[Dict[str, Any]]) -> Tuple[str, ...]:
+    """Generate the template variables for a scan and encode them as CSV rows (header first)"""
+    return tuple(iter_csv_rows(generate_template_variables(scan_data, candidates)))
+
+async def iter_csv(csv_rows: Iterable[str]) -> AsyncIterator[str]:
+    """
+    Async iterator over encoded CSV rows for StreamingResponse, which would otherwise
+    iterate a sync iterable in the threadpool
+    """
+    for row in csv_rows:
+        yield row
+
+def create_csv_content(template_data: Dict[str, str]) -> str:
+    """Create CSV content from template data"""
+    return ''.join(iter_csv_rows(template_data))
+
+# Variable names of a full export (three candidates plus the featured one), sorted once at import
+_TEMPLATE_KEY_SET = frozenset(generate_template_variables({}, _MOCK_CANDIDATES))
+_SORTED_TEMPLATE_KEYS = tuple(sorted(_TEMPLATE_KEY_SET))
@@ -2,28 +2,94 @@
 Market Scans API endpoints
 """
 
-import csv
-import io
+import asyncio
+import hashlib
 import uuid
-from datetime import datetime
-from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, HTTPException, Query, BackgroundTasks, Response
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Iterator, Tuple
+from fastapi import APIRouter, HTTPException, Query, BackgroundTasks, Request, Response
+from fastapi.responses import StreamingResponse
 from loguru import logger
 
 from app.models.market_scan import (
     MarketScanRequest,
     MarketScanResponse, 
-    MarketScanSummary,
     MarketScanList,
-    MarketScanDB
+    SkillsRecommendation
 )
+from app.core.cache import TTLCache
+from app.core.csv_lines import csv_line_writer
 from app.core.database import get_database
+from app.core.task_queue import bump_cache_version, enqueue_job, get_cache_version
+from app.core.pagination import decode_cursor, next_page_cursor
 from app.core.ai_service import ai_service
-from app.services.job_analyzer import JobAnalyzer
-from app.services.salary_calculator import SalaryCalculator
+from app.services.embedding_service import embedding_service
+from app.services.job_analyzer import job_analyzer
+from app.services.salary_calculator import salary_calculator
+from app.services.semantic_cache import job_analysis_cache
+from app.services.vector_search import vector_search_service
 
 router = APIRouter()
 
+# Template candidates per role category; the candidate pool changes far less often than scans are exported
+TEMPLATE_CANDIDATE_CACHE_TTL_SECONDS = 300
+_template_candidate_cache = TTLCache(maxsize=64, ttl=TEMPLATE_CANDIDATE_CACHE_TTL_SECONDS)
+
+# Listing projection matching MarketScanSummary; every field is a flat column, the pay band and
+# primary region are stored when an analysis completes
+_SCAN_SUMMARY_COLUMNS = (
+    'id,client_name,company_domain,job_title,role_category,status,created_at,'
+    'recommended_pay_band,primary_region'
+)
+
+# Listing totals per filter combination. Large counts are costly to repeat and a minute of drift is
+# invisible at that size, so totals from SCAN_COUNT_CACHE_MIN_COUNT up are cached; smaller ones are
+# counted exactly on every request. An unfiltered total uses the planner's estimate only from
+# SCAN_COUNT_ESTIMATE_MIN_COUNT up: on a small or never-analyzed table the estimate can be far off.
+SCAN_COUNT_CACHE_TTL_SECONDS = 60
+SCAN_COUNT_CACHE_MIN_COUNT = 1000
+SCAN_COUNT_ESTIMATE_MIN_COUNT = 10000
+_scan_count_cache = TTLCache(maxsize=256, ttl=SCAN_COUNT_CACHE_TTL_SECONDS)
+
+# Similar-scan results per (version, scan_id, threshold, limit). They only change when a scan's
+# vector is stored or a scan is deleted, and both call invalidate_similar_scans. Analyses may run
+# on the queue worker, so the version is shared through Redis to reach every API process.
+SIMILAR_SCANS_CACHE_TTL_SECONDS = 300
+SIMILAR_SCANS_CACHE_VERSION = 'similar_scans'
+_similar_scans_cache = TTLCache(maxsize=256, ttl=SIMILAR_SCANS_CACHE_TTL_SECONDS)
+
+async def invalidate_similar_scans() -> None:
+    """Drop cached similar-scan results in this process and, through Redis, in every other one"""
+    _similar_scans_cache.clear()
+    await bump_cache_version(SIMILAR_SCANS_CACHE_VERSION)
+
+# Job analyses in progress keyed by a hash of the posting, so identical submissions share one run
+_inflight_analyses: Dict[str, asyncio.Future] = {}
+
+# Vector analytics are polled by dashboards but change slowly, so recompute them at most once per TTL
+ANALYTICS_CACHE_TTL_SECONDS = 30
+_analytics_cache = TTLCache(maxsize=16, ttl=ANALYTICS_CACHE_TTL_SECONDS)
+_ANALYTICS_CACHE_CONTROL = f"public, max-age={ANALYTICS_CACHE_TTL_SECONDS}"
+
+# Turns region and skill category names into template variable prefixes
+_SAFE_NAME = str.maketrans(' ', '_')
+
+# Per-region salary template variables, in CSV column order
+_SALARY_FIELDS = ('low_salary', 'mid_salary', 'high_salary', 'currency', 'period', 'savings_vs_us')
+
+def scan_etag(*parts: Any) -> str:
+    """Strong ETag over the values a response is derived from"""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already names this ETag"""
+    if_none_match = request.headers.get('if-none-match')
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == '*' or etag in (tag.strip().removeprefix('W/') for tag in if_none_match.split(','))
+
 @router.post("/analyze", response_model=MarketScanResponse)
 async def create_market_scan(
     request: MarketScanRequest,
@@ -33,60 +99,55 @@ async def create_market_scan(
     Create and analyze a new market scan
     """
     try:
-        # Generate unique ID
+        # Generate unique ID; one timestamp serves the record and the response
         scan_id = str(uuid.uuid4())
+        now = datetime.now(timezone.utc).isoformat()
+        
+        # Create initial database record from the already validated request; the remaining
+        # columns take their database defaults
+        scan_record = {
+            'id': scan_id,
+            'client_name': request.client_name,
+            'client_email': request.client_email,
+            'company_domain': request.company_domain,
+            'job_title': request.job_title,
+            'job_description': request.job_description,
+            'hiring_challenges': request.hiring_challenges,
+            'status': 'analyzing',
+            'created_at': now,
+            'updated_at': now
+        }
+        await get_database().create_market_scan(scan_record, returning='minimal')
         
-        # Create initial database record
-        scan_data = MarketScanDB(
-            id=scan_id,
-            client_name=request.client_name,
-            client_email=request.client_email,
-            company_domain=request.company_domain,
-            job_title=request.job_title,
-            job_description=request.job_description,
-            hiring_challenges=request.hiring_challenges,
-            status="analyzing",
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
-        )
-        
-        # Save to database - convert datetime objects to ISO strings
-        scan_dict = scan_data.dict()
-        scan_dict['created_at'] = scan_dict['created_at'].isoformat() if scan_dict.get('created_at') else None
-        scan_dict['updated_at'] = scan_dict['updated_at'].isoformat() if scan_dict.get('updated_at') else None
-        created_scan = await get_database().create_market_scan(scan_dict)
-        
-        # Start background analysis
-        background_tasks.add_task(
-            process_market_scan_analysis,
+        # Hand the analysis to the worker queue so it survives API restarts; without one
+        # configured it runs as an in-process background task
+        queued = await enqueue_job(
+            'process_market_scan_analysis',
             scan_id,
-            request
+            request.model_dump(mode='json'),
+            job_id=scan_id
         )
+        if not queued:
+            background_tasks.add_task(
+                process_market_scan_analysis,
+                scan_id,
+                request
+            )
         
         logger.info(f"✅ Created market scan {scan_id} for {request.client_name}")
         
-        # Return immediate response with processing status
-        return MarketScanResponse(
-            id=scan_id,
-            client_name=request.client_name,
-            client_email=request.client_email,
-            company_domain=request.company_domain,
-            job_title=request.job_title,
-            job_description=request.job_description,
-            hiring_challenges=request.hiring_challenges,
-            status="analyzing",
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
-        )
+        # Return immediate response with processing status; response_model validates the record once
+        return scan_record
         
     except Exception as e:
         logger.error(f"❌ Failed to create market scan: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to create market scan: {str(e)}")
 
 @router.get("/{scan_id}", response_model=MarketScanResponse)
-async def get_market_scan(scan_id: str):
+async def get_market_scan(scan_id: str, request: Request, response: Response):
     """
-    Retrieve a specific market scan by ID
+    Retrieve a specific market scan by ID.
+    Clients sending the previous ETag in If-None-Match get a 304 while the scan is unchanged.
     """
     try:
         scan_data = await get_database().get_market_scan(scan_id)
@@ -94,7 +155,13 @@ async def get_market_scan(scan_id: str):
         if not scan_data:
             raise HTTPException(status_code=404, detail="Market scan not found")
         
-        return MarketScanResponse(**scan_data)
+        etag = scan_etag(scan_id, scan_data.get('updated_at'))
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        response.headers["ETag"] = etag
+        # Returned as a dict so response_model validates the row once, instead of building the model twice
+        return scan_data
         
     except HTTPException:
         raise
@@ -104,65 +171,93 @@ async def get_market_scan(scan_id: str):
 
 @router.get("/", response_model=MarketScanList)
 async def list_market_scans(
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, description="Page number (deprecated, use cursor)"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor value from the previous page"),
     status: Optional[str] = Query(None, description="Filter by status"),
     role_category: Optional[str] = Query(None, description="Filter by role category"),
-    client_name: Optional[str] = Query(None, description="Filter by client name")
+    client_name: Optional[str] = Query(None, description="Filter by client name (case-insensitive, partial match)")
 ):
     """
-    List market scans with pagination and filtering
+    List market scans with pagination and filtering.
+    Follow next_cursor for constant-cost deep pagination; page-number paging is kept for existing clients.
     """
     try:
-        offset = (page - 1) * page_size
-        
-        # Get filtered scans
-        scans = await get_database().get_market_scans(limit=page_size, offset=offset)
-        
-        # Convert to summary format
-        scan_summaries = [
-            MarketScanSummary(
-                id=scan['id'],
-                client_name=scan['client_name'],
-                company_domain=scan['company_domain'],
-                job_title=scan['job_title'],
-                role_category=scan.get('role_category'),
-                status=scan['status'],
-                created_at=scan['created_at'],
-                recommended_pay_band=scan.get('salary_recommendations', {}).get('recommended_pay_band') if isinstance(scan.get('salary_recommendations'), dict) else None,
-                primary_region=scan.get('recommended_regions', [None])[0] if scan.get('recommended_regions') else None
-            )
-            for scan in scans
-        ]
-        
-        # Note: In a real implementation, you'd also get total count for pagination
-        total_count = len(scan_summaries)  # Simplified for now
-        
-        return MarketScanList(
-            scans=scan_summaries,
-            total_count=total_count,
-            page=page,
-            page_size=page_size,
-            has_next=len(scan_summaries) == page_size
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+        
+        # Filters are applied by the database. The page and the total are independent queries,
+        # run them together. One extra row tells whether another page follows.
+        filters = {'status': status, 'role_category': role_category, 'client_name': client_name}
+        db = get_database()
+        scans, total_count = await asyncio.gather(
+            db.get_market_scans(
+                limit=page_size + 1,
+                offset=(page - 1) * page_size,
+                columns=_SCAN_SUMMARY_COLUMNS,
+                after=after,
+                **filters
+            ),
+            count_scans(**filters)
         )
         
+        scans, next_cursor = next_page_cursor(scans, page_size)
+        
+        # Rows are already in summary shape, so response_model validates them once as the listing is sent
+        return {
+            "scans": scans,
+            "total_count": total_count,
+            "page": page,
+            "page_size": page_size,
+            "has_next": next_cursor is not None,
+            "next_cursor": next_cursor
+        }
+        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Failed to list market scans: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to list market scans: {str(e)}")
 
+async def count_scans(**filters) -> int:
+    """
+    Total scans matching the listing filters, exact unless the table is large. An unfiltered total
+    over a large table is the planner's estimate, so it costs the same however large the table
+    grows; large totals are cached for a minute.
+    """
+    key = tuple(filters.items())
+    total_count = _scan_count_cache.get(key)
+    if total_count is not None:
+        return total_count
+    
+    db = get_database()
+    if not any(filters.values()):
+        total_count = await db.count_market_scans(estimated=True)
+    if total_count is None or total_count < SCAN_COUNT_ESTIMATE_MIN_COUNT:
+        total_count = await db.count_market_scans(**filters)
+    
+    if total_count >= SCAN_COUNT_CACHE_MIN_COUNT:
+        _scan_count_cache.set(key, total_count)
+    return total_count
+
 @router.delete("/{scan_id}")
 async def delete_market_scan(scan_id: str):
     """
     Delete a market scan
     """
     try:
-        # Check if scan exists
-        existing_scan = await get_database().get_market_scan(scan_id)
-        if not existing_scan:
+        # A single delete both checks existence and removes the scan
+        if not await get_database().delete_market_scan(scan_id):
             raise HTTPException(status_code=404, detail="Market scan not found")
         
-        # TODO: Implement delete functionality in database manager
-        # await get_database().delete_market_scan(scan_id)
+        # The vector lives in Pinecone, outside the database transaction; a failure there is
+        # logged and leaves only an orphaned vector behind
+        await asyncio.to_thread(embedding_service.delete_scan, scan_id)
+        await invalidate_similar_scans()
         
         logger.info(f"✅ Deleted market scan {scan_id}")
         return {"message": "Market scan deleted successfully"}
@@ -180,23 +275,33 @@ async def get_similar_scans(
     similarity_threshold: float = Query(0.70, ge=0.0, le=1.0, description="Minimum similarity score")
 ):
     """
-    Get similar market scans using semantic matching
+    Get similar market scans using semantic matching.
+    Results are cached, so repeated and concurrent requests share one embedding and vector search.
     """
     try:
-        # Get the original scan
-        scan_data = await get_database().get_market_scan(scan_id)
-        if not scan_data:
-            raise HTTPException(status_code=404, detail="Market scan not found")
+        async def load_similar_scans() -> Optional[Tuple]:
+            # Get the original scan
+            scan_data = await get_database().get_market_scan(scan_id)
+            if not scan_data:
+                raise HTTPException(status_code=404, detail="Market scan not found")
+            
+            # Use vector search to find semantically similar scans
+            similar_scans, confidence_score = await vector_search_service.find_similar_market_scans(
+                job_title=scan_data['job_title'],
+                job_description=scan_data['job_description'],
+                current_scan_id=scan_id,
+                similarity_threshold=similarity_threshold,
+                max_results=limit
+            )
+            # Empty results (including failed searches) are not cached
+            return (similar_scans, confidence_score) if similar_scans else None
         
-        # Use vector search to find semantically similar scans
-        from app.services.vector_search import vector_search_service
-        similar_scans, confidence_score = await vector_search_service.find_similar_market_scans(
-            job_title=scan_data['job_title'],
-            job_description=scan_data['job_description'],
-            current_scan_id=scan_id,
-            similarity_threshold=similarity_threshold,
-            max_results=limit
+        version = await get_cache_version(SIMILAR_SCANS_CACHE_VERSION)
+        cached_result = await _similar_scans_cache.get_or_set(
+            (version, scan_id, similarity_threshold, limit),
+            load_similar_scans
         )
+        similar_scans, confidence_score = cached_result or ([], 0.0)
         
         return {
             "scan_id": scan_id,
@@ -215,18 +320,24 @@ async def get_similar_scans(
 
 @router.get("/analytics/trends")
 async def get_market_trends(
+    response: Response,
     lookback_days: int = Query(90, ge=1, le=365, description="Days to analyze")
 ):
     """
     Get market trends and analytics from semantic search data
     """
     try:
-        from app.services.vector_search import vector_search_service
-        trends = await vector_search_service.get_market_trends(lookback_days)
         
+        # Failed analyses return empty trends, which are not cached
+        trends = await _analytics_cache.get_or_set(
+            ('trends', lookback_days),
+            lambda: vector_search_service.get_market_trends(lookback_days)
+        )
+        
+        response.headers["Cache-Control"] = _ANALYTICS_CACHE_CONTROL
         return {
             "trends": trends,
-            "generated_at": datetime.utcnow().isoformat(),
+            "generated_at": datetime.now(timezone.utc).isoformat(),
             "lookback_days": lookback_days
         }
         
@@ -235,61 +346,126 @@ async def get_market_trends(
         raise HTTPException(status_code=500, detail=f"Failed to get market trends: {str(e)}")
 
 @router.get("/analytics/vector-stats")
-async def get_vector_stats():
+async def get_vector_stats(response: Response):
     """
     Get vector database statistics
     """
     try:
-        from app.services.embedding_service import embedding_service
-        stats = await embedding_service.get_index_stats()
         
+        # Failed lookups return empty stats, which are not cached
+        stats = await _analytics_cache.get_or_set(
+            ('vector_stats', embedding_service.index_name),
+            embedding_service.get_index_stats
+        )
+        
+        response.headers["Cache-Control"] = _ANALYTICS_CACHE_CONTROL
         return {
             "vector_stats": stats,
             "index_name": embedding_service.index_name,
             "embedding_model": embedding_service.embedding_model,
             "embedding_dimension": embedding_service.embedding_dimension,
-            "retrieved_at": datetime.utcnow().isoformat()
+            "retrieved_at": datetime.now(timezone.utc).isoformat()
         }
         
     except Exception as e:
         logger.error(f"❌ Failed to get vector stats: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get vector stats: {str(e)}")
 
+async def _job_analysis_cache_embedding(request: MarketScanRequest) -> Optional[List[float]]:
+    """
+    Embed the posting as the similar-scan search does, so on a miss the search reuses the
+    memoized embedding; return None so the cache is skipped
+    """
+    try:
+        return await embedding_service.generate_embedding(
+            f"Job Title: {request.job_title}\n\nJob Description: {request.job_description}"
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Skipping job analysis cache: {e}")
+        return None
+
+async def run_job_analysis(scan_id: str, request: MarketScanRequest) -> Tuple:
+    """
+    Analyze the posting, reusing the result of a near-duplicate posting from the semantic cache when possible
+    """
+    # Entries map hiring challenges to results: they shape the analysis but not the similarity
+    hiring_challenges = request.hiring_challenges or ""
+    cache_embedding = await _job_analysis_cache_embedding(request)
+    cached_entry = job_analysis_cache.get(cache_embedding) if cache_embedding else None
+    cached_analysis = cached_entry.get(hiring_challenges) if cached_entry else None
+    if cached_analysis:
+        logger.info(f"♻️ Reusing cached job analysis for market scan {scan_id}")
+        job_analysis, similar_scans, confidence_score = cached_analysis
+        return job_analysis.model_copy(deep=True), similar_scans, confidence_score
+    
+    job_analysis, similar_scans, confidence_score = await job_analyzer.analyze_job_with_similar_scans(
+        job_title=request.job_title,
+        job_description=request.job_description,
+        hiring_challenges=hiring_challenges,
+        scan_id=scan_id
+    )
+    if cache_embedding:
+        result = (job_analysis.model_copy(deep=True), similar_scans, confidence_score)
+        if cached_entry is not None:
+            cached_entry[hiring_challenges] = result
+        else:
+            job_analysis_cache.set(cache_embedding, {hiring_challenges: result})
+    return job_analysis, similar_scans, confidence_score
+
+async def analyze_posting_once(scan_id: str, request: MarketScanRequest) -> Tuple:
+    """
+    Run the job analysis for a posting, or wait for the run already in flight for identical content
+    """
+    key = hashlib.blake2b(
+        '\x1f'.join((request.job_title, request.job_description, request.hiring_challenges or '')).encode(),
+        digest_size=16
+    ).hexdigest()
+    
+    in_flight = _inflight_analyses.get(key)
+    if in_flight is not None:
+        logger.info(f"♻️ Waiting for the in-flight analysis of the same posting for market scan {scan_id}")
+        job_analysis, similar_scans, confidence_score = await asyncio.shield(in_flight)
+        return job_analysis.model_copy(deep=True), similar_scans, confidence_score
+    
+    in_flight = asyncio.ensure_future(run_job_analysis(scan_id, request))
+    _inflight_analyses[key] = in_flight
+    in_flight.add_done_callback(lambda _: _inflight_analyses.pop(key, None))
+    return await asyncio.shield(in_flight)
+
 # Background processing function
 async def process_market_scan_analysis(scan_id: str, request: MarketScanRequest):
     """
     Background task to process market scan analysis
     """
-    start_time = datetime.utcnow()
+    start_time = datetime.now(timezone.utc)
     
     try:
         logger.info(f"🔄 Starting analysis for market scan {scan_id}")
         
-        # Step 1: AI Job Analysis with Semantic Matching using enhanced JobAnalyzer
-        job_analyzer = JobAnalyzer()
-        job_analysis, similar_scans, confidence_score = await job_analyzer.analyze_job_with_similar_scans(
-            job_title=request.job_title,
-            job_description=request.job_description,
-            hiring_challenges=request.hiring_challenges or "",
-            scan_id=scan_id
-        )
+        # Step 1: AI Job Analysis with Semantic Matching using enhanced JobAnalyzer,
+        # shared with an identical posting already being analyzed
+        job_analysis, similar_scans, confidence_score = await analyze_posting_once(scan_id, request)
         
+        # Steps 2 and 3 both only need the job analysis, so run them concurrently:
         # Step 2: Generate Salary Recommendations using SalaryCalculator
-        salary_calculator = SalaryCalculator()
-        salary_recommendations = await salary_calculator.calculate_salary_recommendations(job_analysis)
-        
         # Step 3: Store analysis in vector database for future semantic matching
-        await job_analyzer.store_analysis_vector(
-            scan_id=scan_id,
-            job_title=request.job_title,
-            job_description=request.job_description,
-            job_analysis=job_analysis,
-            company_domain=request.company_domain,
-            client_name=request.client_name
+        # (store_analysis_vector logs and swallows its own failures, so it never fails the scan)
+        salary_recommendations, _ = await asyncio.gather(
+            salary_calculator.calculate_salary_recommendations(job_analysis),
+            job_analyzer.store_analysis_vector(
+                scan_id=scan_id,
+                job_title=request.job_title,
+                job_description=request.job_description,
+                job_analysis=job_analysis,
+                company_domain=request.company_domain,
+                client_name=request.client_name
+            )
         )
         
+        # The stored vector can now appear in other scans' similar results
+        await invalidate_similar_scans()
+        
         # Step 4: Create basic skills recommendations
-        from app.models.market_scan import SkillsRecommendation
         skills_recommendations = SkillsRecommendation(
             must_have_skills=job_analysis.must_have_skills,
             nice_to_have_skills=job_analysis.nice_to_have_skills,
@@ -298,25 +474,27 @@ async def process_market_scan_analysis(scan_id: str, request: MarketScanRequest)
         )
         
         # Calculate processing time
-        processing_time = (datetime.utcnow() - start_time).total_seconds()
+        processing_time = (datetime.now(timezone.utc) - start_time).total_seconds()
         
-        # Update database with results - convert Pydantic models to dicts
+        # Update database with results - convert Pydantic models to JSON-safe dicts
         update_data = {
-            'job_analysis': job_analysis.dict(),
-            'salary_recommendations': salary_recommendations.dict(),
-            'skills_recommendations': skills_recommendations.dict(),
+            'job_analysis': job_analysis.model_dump(mode='json'),
+            'salary_recommendations': salary_recommendations.model_dump(mode='json'),
+            'skills_recommendations': skills_recommendations.model_dump(mode='json'),
             'status': 'completed',
-            'updated_at': datetime.utcnow().isoformat(),
+            'updated_at': datetime.now(timezone.utc).isoformat(),
             'processing_time_seconds': processing_time,
             'similar_scans_count': len(similar_scans),
             'role_category': job_analysis.role_category.value,
             'experience_level': job_analysis.experience_level.value,
             'recommended_regions': [r.value for r in job_analysis.recommended_regions],
+            'recommended_pay_band': salary_recommendations.recommended_pay_band,
+            'primary_region': job_analysis.recommended_regions[0].value if job_analysis.recommended_regions else None,
             'confidence_score': confidence_score
         }
         
-        # Update database with completed analysis
-        await get_database().update_market_scan(scan_id, update_data)
+        # Update database with completed analysis; the full row is not needed back
+        await get_database().update_market_scan(scan_id, update_data, returning='minimal')
         
         logger.info(f"✅ Completed analysis for market scan {scan_id} in {processing_time:.2f}s")
         
@@ -326,19 +504,21 @@ async def process_market_scan_analysis(scan_id: str, request: MarketScanRequest)
         # Update status to failed
         await get_database().update_market_scan(scan_id, {
             'status': 'failed',
-            'updated_at': datetime.utcnow(),
+            'updated_at': datetime.now(timezone.utc).isoformat(),
             'error_message': str(e)
-        })
+        }, returning='minimal')
 
 
 # CSV Export endpoint for Canva template integration
 @router.get("/{scan_id}/export")
 async def export_market_scan_csv(
     scan_id: str,
+    request: Request,
     format: str = Query("template", description="Export format: 'template' for Canva variables")
 ):
     """
-    Export market scan data as CSV with all 134 template variables for Canva integration
+    Export market scan data as CSV with all 134 template variables for Canva integration.
+    Clients sending the previous ETag in If-None-Match get a 304 while the scan and candidates are unchanged.
     """
     try:
         # Get market scan data
@@ -352,28 +532,46 @@ async def export_market_scan_csv(
             role_category = scan_data['job_analysis'].get('role_category', '')
         candidates = await get_candidate_profiles_for_template(role_category)
         
-        # Generate template variables
-        template_data = generate_template_variables(scan_data, candidates)
+        # The CSV is a deterministic function of the scan and the template candidates
+        etag = scan_etag(
+            scan_id,
+            scan_data.get('updated_at'),
+            [(candidate.get('id'), candidate.get('updated_at')) for candidate in candidates[:3]]
+        )
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
         
-        # Create CSV
-        csv_content = create_csv_content(template_data)
+        # Generate template variables in a worker thread so the CPU work does not stall other requests
+        template_data = await asyncio.to_thread(generate_template_variables, scan_data, candidates)
         
         logger.info(f"✅ Generated CSV export for scan {scan_id} with {len(template_data[0]) if template_data else 0} template variables")
         
-        return Response(
-            content=csv_content,
+        # Stream the CSV a line at a time instead of building the whole file first
+        return StreamingResponse(
+            iter_csv_content(template_data),
             media_type="text/csv",
             headers={
-                "Content-Disposition": f"attachment; filename=market-scan-{scan_id}-export.csv"
+                "Content-Disposition": f"attachment; filename=market-scan-{scan_id}-export.csv",
+                "ETag": etag
             }
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Failed to export CSV for scan {scan_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to export CSV: {str(e)}")
 
 
 async def get_candidate_profiles_for_template(role_category: str = '') -> List[Dict[str, Any]]:
+    """Get candidate profiles for template variables, filtered by role category (shared, do not mutate)"""
+    return await _template_candidate_cache.get_or_set(
+        role_category or '__all__',
+        lambda: select_candidate_profiles_for_template(role_category)
+    )
+
+
+async def select_candidate_profiles_for_template(role_category: str = '') -> List[Dict[str, Any]]:
     """Get candidate profiles from database for template variables, filtered by role category"""
     try:
         if role_category:
@@ -394,6 +592,19 @@ async def get_candidate_profiles_for_template(role_category: str = '') -> List[D
         return []
 
 
+@lru_cache(maxsize=64)
+def region_salary_keys(region_name: str) -> Tuple[str, ...]:
+    """Salary template variable names for a region, built once per region name"""
+    safe_region = region_name.lower().translate(_SAFE_NAME)
+    return tuple(f'{safe_region}_{field}' for field in _SALARY_FIELDS)
+
+
+@lru_cache(maxsize=64)
+def skill_category_key(category_name: str) -> str:
+    """Template variable name for a skill category, built once per category name"""
+    return f'{category_name.lower().translate(_SAFE_NAME)}_skills'
+
+
 def generate_template_variables(scan_data: Dict[str, Any], candidates: List[Dict[str, Any]]) -> List[Dict[str, str]]:
     """Generate all 134+ template variables for Canva"""
     
@@ -401,11 +612,8 @@ def generate_template_variables(scan_data: Dict[str, Any], candidates: List[Dict
     logger.info(f"🔍 Processing scan data keys: {list(scan_data.keys())}")
     logger.info(f"🔍 Found {len(candidates)} candidates")
     
-    # Extract scan data fields
-    template_vars = {}
-    
     # Basic scan information
-    template_vars.update({
+    template_vars = {
         'company_domain': scan_data.get('company_domain', ''),
         'job_title': scan_data.get('job_title', ''),
         'client_name': scan_data.get('client_name', ''),
@@ -413,7 +621,7 @@ def generate_template_variables(scan_data: Dict[str, Any], candidates: List[Dict
         'scan_date': scan_data.get('created_at', ''),
         'status': scan_data.get('status', ''),
         'confidence_score': str(scan_data.get('confidence_score', 0))
-    })
+    }
     
     # Job analysis data
     if scan_data.get('job_analysis'):
@@ -437,14 +645,14 @@ def generate_template_variables(scan_data: Dict[str, Any], candidates: List[Dict
         salary_recs = scan_data['salary_recommendations']
         if salary_recs.get('salary_recommendations'):
             for region_name, salary_data in salary_recs['salary_recommendations'].items():
-                safe_region = region_name.lower().replace(' ', '_')
+                low_key, mid_key, high_key, currency_key, period_key, savings_key = region_salary_keys(region_name)
                 template_vars.update({
-                    f'{safe_region}_low_salary': str(salary_data.get('low', 0)),
-                    f'{safe_region}_mid_salary': str(salary_data.get('mid', 0)),
-                    f'{safe_region}_high_salary': str(salary_data.get('high', 0)),
-                    f'{safe_region}_currency': salary_data.get('currency', ''),
-                    f'{safe_region}_period': salary_data.get('period', ''),
-                    f'{safe_region}_savings_vs_us': str(salary_data.get('savings_vs_us', 0))
+                    low_key: str(salary_data.get('low', 0)),
+                    mid_key: str(salary_data.get('mid', 0)),
+                    high_key: str(salary_data.get('high', 0)),
+                    currency_key: salary_data.get('currency', ''),
+                    period_key: salary_data.get('period', ''),
+                    savings_key: str(salary_data.get('savings_vs_us', 0))
                 })
         
         # Market insights
@@ -468,8 +676,7 @@ def generate_template_variables(scan_data: Dict[str, Any], candidates: List[Dict
         # Skill categories
         if skills.get('skill_categories'):
             for cat_name, cat_skills in skills['skill_categories'].items():
-                safe_cat = cat_name.lower().replace(' ', '_')
-                template_vars[f'{safe_cat}_skills'] = ', '.join(cat_skills)
+                template_vars[skill_category_key(cat_name)] = ', '.join(cat_skills)
     
     # Add candidate profile data
     for i, candidate in enumerate(candidates[:3]):  # Limit to 3 candidates to match market scan
@@ -491,18 +698,19 @@ def generate_template_variables(scan_data: Dict[str, Any], candidates: List[Dict
     return [template_vars]
 
 
-def create_csv_content(template_data: List[Dict[str, str]]) -> str:
-    """Create CSV content from template data"""
+def iter_csv_content(template_data: List[Dict[str, str]]) -> Iterator[str]:
+    """Yield CSV content from template data one line at a time, header first"""
     if not template_data:
-        return ""
-    
-    output = io.StringIO()
-    
-    # Get all field names from the first row
-    fieldnames = list(template_data[0].keys())
-    
-    writer = csv.DictWriter(output, fieldnames=fieldnames)
-    writer.writeheader()
-    writer.writerows(template_data)
+        return
     
-    return output.getvalue()
\ No newline at end of file
+    # Every row carries the same variables in the same order, so write the values directly
+    # rather than having DictWriter look each field up again per row
+    writer = csv_line_writer()
+    yield writer.writerow(template_data[0].keys())
+    for row in template_data:
+        yield writer.writerow(row.values())
+
+
+def create_csv_content(template_data: List[Dict[str, str]]) -> str:
+    """Create CSV content from template data"""
+    return ''.join(iter_csv_content(template_data))
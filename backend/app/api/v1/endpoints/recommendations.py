@@ -2,6 +2,7 @@
 Salary and Skills Recommendations API endpoints
 """
 
+from collections import Counter
 from typing import Dict, Any, List, Optional
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
@@ -127,23 +128,17 @@ async def get_skills_recommendations(role_category: str):
             }
         
         # Aggregate skills from historical data
-        must_have_skills = {}
-        nice_to_have_skills = {}
+        must_have_skills = Counter()
+        nice_to_have_skills = Counter()
         
         for scan in role_specific_scans:
             job_analysis = scan.get('job_analysis', {})
-            
-            # Count frequency of must-have skills
-            for skill in job_analysis.get('must_have_skills', []):
-                must_have_skills[skill] = must_have_skills.get(skill, 0) + 1
-                
-            # Count frequency of nice-to-have skills  
-            for skill in job_analysis.get('nice_to_have_skills', []):
-                nice_to_have_skills[skill] = nice_to_have_skills.get(skill, 0) + 1
+            must_have_skills.update(job_analysis.get('must_have_skills', []))
+            nice_to_have_skills.update(job_analysis.get('nice_to_have_skills', []))
         
-        # Sort by frequency and get top skills
-        top_must_have = sorted(must_have_skills.items(), key=lambda x: x[1], reverse=True)[:8]
-        top_nice_to_have = sorted(nice_to_have_skills.items(), key=lambda x: x[1], reverse=True)[:8]
+        # Top skills by frequency (most_common selects with a heap rather than a full sort)
+        top_must_have = must_have_skills.most_common(8)
+        top_nice_to_have = nice_to_have_skills.most_common(8)
         
         return {
             "role_category": role_category,
@@ -187,15 +182,14 @@ async def get_market_insights(role_category: str):
             }
         
         # Analyze trends
-        regions_demand = {}
+        regions_demand = Counter()
         complexity_scores = []
         salary_trends = []
         
         for scan in role_scans:
             # Track regional demand
             recommended_regions = scan.get('job_analysis', {}).get('recommended_regions', [])
-            for region in recommended_regions:
-                regions_demand[region] = regions_demand.get(region, 0) + 1
+            regions_demand.update(recommended_regions)
             
             # Track complexity
             complexity = scan.get('job_analysis', {}).get('complexity_score', 5)
@@ -208,7 +202,7 @@ async def get_market_insights(role_category: str):
         
         # Calculate insights
         avg_complexity = sum(complexity_scores) / len(complexity_scores) if complexity_scores else 5
-        most_demanded_regions = sorted(regions_demand.items(), key=lambda x: x[1], reverse=True)[:3]
+        most_demanded_regions = regions_demand.most_common(3)
         
         return {
             "role_category": role_category,
@@ -2,12 +2,38 @@
 AI Service integration for job analysis and recommendations
 """
 
+import asyncio
+import hashlib
 import json
 from typing import Dict, List, Any, Optional
 from openai import OpenAI
 from loguru import logger
 from app.core.config import settings
 
+# Shared by every chat completion in the process, so bursts of background analyses stay within
+# OpenAI rate limits instead of all firing at once
+_chat_semaphore = asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENT_REQUESTS)
+
+# Identical chat requests in flight, keyed by a hash of the request, so they share one API call
+_inflight_chats: Dict[str, asyncio.Future] = {}
+
+async def create_chat_completion(client: OpenAI, **request: Any) -> Any:
+    """
+    Run a chat completion off the event loop, bounded by the shared concurrency limit.
+    Concurrent identical requests share a single API call and its (read-only) response.
+    """
+    key = hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode()).hexdigest()
+    in_flight = _inflight_chats.get(key)
+    if in_flight is None:
+        in_flight = asyncio.ensure_future(_run_chat_completion(client, request))
+        _inflight_chats[key] = in_flight
+        in_flight.add_done_callback(lambda _: _inflight_chats.pop(key, None))
+    return await asyncio.shield(in_flight)
+
+async def _run_chat_completion(client: OpenAI, request: Dict[str, Any]) -> Any:
+    async with _chat_semaphore:
+        return await asyncio.to_thread(client.chat.completions.create, **request)
+
 class AIService:
     """OpenAI integration for job description analysis and recommendations"""
     
@@ -22,7 +48,8 @@ class AIService:
         try:
             prompt = self._build_job_analysis_prompt(job_title, job_description, hiring_challenges)
             
-            response = self.client.chat.completions.create(
+            response = await create_chat_completion(
+                self.client,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are an expert recruiter analyzing job requirements for global talent sourcing."},
@@ -92,7 +119,8 @@ class AIService:
         try:
             prompt = self._build_salary_prompt(job_analysis, similar_scans)
             
-            response = self.client.chat.completions.create(
+            response = await create_chat_completion(
+                self.client,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are a compensation expert specializing in global talent markets."},
@@ -227,7 +255,8 @@ class AIService:
             Respond only with valid JSON.
             """
             
-            response = self.client.chat.completions.create(
+            response = await create_chat_completion(
+                self.client,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are an expert in skill assessment and job requirements analysis."},
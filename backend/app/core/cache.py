@@ -0,0 +1,79 @@
+"""
+In-process caching helpers for Tidal Streamline
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+_MISSING = object()
+
+class TTLCache:
+    """Small LRU cache whose entries expire after a fixed number of seconds"""
+
+    def __init__(self, maxsize: int = 128, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._loading: "dict[Hashable, asyncio.Future]" = {}
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return the cached value for key, or default if missing or expired"""
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry when full"""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def get_or_set(self, key: Hashable, loader: Callable[[], Awaitable[Any]], cache_empty: bool = False) -> Any:
+        """
+        Return the cached value for key, or await loader() and cache its result.
+        Concurrent misses for the same key share a single loader() call.
+        Empty results are not cached unless cache_empty is set, so they are retried on the next call.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        future = self._loading.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._load(key, loader, cache_empty))
+            self._loading[key] = future
+            future.add_done_callback(lambda _: self._loading.pop(key, None))
+
+        # Shielded so one cancelled caller does not cancel the load for everyone waiting on it
+        return await asyncio.shield(future)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], cache_empty: bool) -> Any:
+        value = await loader()
+        if value or cache_empty:
+            self.set(key, value)
+        return value
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Remove key and return its value if it has not expired"""
+        entry = self._entries.pop(key, _MISSING)
+        if entry is _MISSING or entry[0] <= time.monotonic():
+            return default
+        return entry[1]
+
+    def clear(self) -> None:
+        """Drop every cached entry"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
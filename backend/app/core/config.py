@@ -17,10 +17,19 @@ class Settings(BaseSettings):
     # Database Configuration (Supabase)
     SUPABASE_URL: Optional[str] = Field(default=None, description="Supabase project URL")
     SUPABASE_SERVICE_KEY: Optional[str] = Field(default=None, description="Supabase service role key")
+    DB_MAX_CONCURRENT_QUERIES: int = Field(default=8, description="Maximum concurrent Supabase queries per process")
+    DB_HTTP_MAX_CONNECTIONS: int = Field(default=100, description="Maximum pooled HTTP connections to Supabase")
+    DB_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=20, description="Idle keep-alive connections kept open to Supabase")
+    DB_HTTP2: bool = Field(default=True, description="Use HTTP/2 for Supabase requests")
+    DB_HTTP_TIMEOUT_SECONDS: float = Field(default=120.0, description="Supabase HTTP request timeout")
     
     # AI Services
     OPENAI_API_KEY: Optional[str] = Field(default=None, description="OpenAI API key")
     OPENAI_MODEL: str = Field(default="gpt-4o", description="OpenAI model to use")
+    OPENAI_MAX_CONCURRENT_REQUESTS: int = Field(default=16, description="Maximum concurrent OpenAI chat requests per process")
+    
+    # Task Queue (arq)
+    REDIS_URL: Optional[str] = Field(default=None, description="Redis URL for the scan analysis queue; analyses run in the API process when unset")
     
     # Vector Store (Pinecone)
     PINECONE_API_KEY: str = Field(default="pcsk_2asZaU_4JFVKA6KRDqh2i37Vn8bcWRx5cPhhGDhYcDmcemg3GGpG2m44TPouFMVkEzQqBe", description="Pinecone API key")
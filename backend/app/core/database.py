@@ -2,16 +2,24 @@
 Database connection and management for Tidal Streamline
 """
 
-from typing import Optional, Dict, Any, List
-from supabase import create_client, Client
+import asyncio
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
+import httpx
+from supabase import create_client, Client, ClientOptions
 from loguru import logger
 from app.core.config import settings
 
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so a value is matched literally"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
 class DatabaseManager:
     """Manages Supabase database connections and operations"""
     
     def __init__(self):
         self.client: Optional[Client] = None
+        # Bounds concurrent queries so gathered calls stay within the pooled connection limit
+        self._query_semaphore = asyncio.Semaphore(settings.DB_MAX_CONCURRENT_QUERIES)
         self._initialize_client()
     
     def _initialize_client(self):
@@ -23,15 +31,32 @@ class DatabaseManager:
             if not settings.SUPABASE_SERVICE_KEY:
                 raise ValueError("SUPABASE_SERVICE_KEY environment variable is required")
                 
+            # One pooled HTTP client for the process, so requests reuse keep-alive
+            # connections instead of paying a TLS handshake each time
+            http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=settings.DB_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.DB_HTTP_MAX_KEEPALIVE_CONNECTIONS
+                ),
+                http2=settings.DB_HTTP2,
+                timeout=settings.DB_HTTP_TIMEOUT_SECONDS
+            )
+            
             self.client = create_client(
                 settings.SUPABASE_URL,
-                settings.SUPABASE_SERVICE_KEY
+                settings.SUPABASE_SERVICE_KEY,
+                options=ClientOptions(httpx_client=http_client)
             )
             logger.info("✅ Database connection initialized successfully")
         except Exception as e:
             logger.error(f"❌ Failed to initialize database connection: {e}")
             raise
     
+    async def _execute(self, query):
+        """Run a blocking Supabase query in a worker thread so independent calls can overlap"""
+        async with self._query_semaphore:
+            return await asyncio.to_thread(query.execute)
+    
     async def test_connection(self) -> bool:
         """Test database connectivity"""
         try:
@@ -39,7 +64,7 @@ class DatabaseManager:
                 return False
             
             # Simple test query
-            result = self.client.table('market_scans').select("count", count="exact").execute()
+            result = await self._execute(self.client.table('market_scans').select("count", count="exact"))
             logger.info("✅ Database connection test successful")
             return True
         except Exception as e:
@@ -47,12 +72,21 @@ class DatabaseManager:
             return False
     
     # Market Scans Operations
-    async def create_market_scan(self, scan_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Create a new market scan record"""
+    async def create_market_scan(
+        self,
+        scan_data: Dict[str, Any],
+        returning: str = 'representation'
+    ) -> Dict[str, Any]:
+        """
+        Create a new market scan record.
+        Pass returning='minimal' when scan_data already carries the id; the submitted record is
+        returned instead of the stored row, which is then not sent back.
+        """
         try:
-            result = self.client.table('market_scans').insert(scan_data).execute()
-            logger.info(f"✅ Created market scan: {result.data[0]['id']}")
-            return result.data[0]
+            result = await self._execute(self.client.table('market_scans').insert(scan_data, returning=returning))
+            created_scan = result.data[0] if result.data else scan_data
+            logger.info(f"✅ Created market scan: {created_scan['id']}")
+            return created_scan
         except Exception as e:
             logger.error(f"❌ Failed to create market scan: {e}")
             raise
@@ -60,56 +94,221 @@ class DatabaseManager:
     async def get_market_scan(self, scan_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve a market scan by ID"""
         try:
-            result = self.client.table('market_scans').select("*").eq('id', scan_id).execute()
+            result = await self._execute(self.client.table('market_scans').select("*").eq('id', scan_id))
             return result.data[0] if result.data else None
         except Exception as e:
             logger.error(f"❌ Failed to get market scan {scan_id}: {e}")
             return None
     
-    async def get_market_scans(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
-        """Retrieve multiple market scans with pagination"""
+    @staticmethod
+    def _filter_market_scans(query, status: str = None, role_category: str = None, client_name: str = None):
+        """Apply the optional market scan listing filters to a query"""
+        if status:
+            query = query.eq('status', status)
+        if role_category:
+            query = query.eq('role_category', role_category)
+        if client_name:
+            query = query.ilike('client_name', f'%{_escape_like(client_name)}%')
+        return query
+    
+    async def get_market_scans(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        columns: str = "*",
+        after: Optional[Tuple[str, str]] = None,
+        status: str = None,
+        role_category: str = None,
+        client_name: str = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve multiple market scans newest first, optionally projecting specific columns and
+        filtered by status, role and client name (case-insensitive substring match).
+        Pass the (created_at, id) of the last row seen as `after` to continue from it (keyset
+        pagination, offset is ignored); otherwise offset/limit paging is used.
+        """
         try:
-            result = (
+            query = self._filter_market_scans(
+                self.client.table('market_scans').select(columns),
+                status, role_category, client_name
+            )
+            if after:
+                created_at, row_id = after
+                query = query.or_(
+                    f'created_at.lt."{created_at}",'
+                    f'and(created_at.eq."{created_at}",id.lt."{row_id}")'
+                )
+            
+            query = query.order('created_at', desc=True).order('id', desc=True)
+            if after:
+                query = query.limit(limit)
+            else:
+                query = query.range(offset, offset + limit - 1)
+            
+            result = await self._execute(query)
+            return result.data
+        except Exception as e:
+            logger.error(f"❌ Failed to get market scans: {e}")
+            return []
+
+    async def iter_market_scans(
+        self,
+        batch_size: int = 200,
+        columns: str = "*",
+        status: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield market scans newest first, fetching one page of batch_size rows at a time"""
+        offset = 0
+        while limit is None or offset < limit:
+            page_size = batch_size if limit is None else min(batch_size, limit - offset)
+            query = self.client.table('market_scans').select(columns)
+            if status:
+                query = query.eq('status', status)
+            query = query.order('created_at', desc=True).range(offset, offset + page_size - 1)
+            
+            try:
+                result = await self._execute(query)
+            except Exception as e:
+                logger.error(f"❌ Failed to get market scans page at offset {offset}: {e}")
+                return
+            
+            for scan in result.data:
+                yield scan
+            
+            if len(result.data) < page_size:
+                return
+            offset += page_size
+
+    async def get_market_scans_by_ids(self, scan_ids: List[str], columns: str = "*") -> List[Dict[str, Any]]:
+        """Retrieve market scans for a list of IDs in a single query"""
+        if not scan_ids:
+            return []
+        try:
+            result = await self._execute(
                 self.client
                 .table('market_scans')
-                .select("*")
-                .order('created_at', desc=True)
-                .range(offset, offset + limit - 1)
-                .execute()
+                .select(columns)
+                .in_('id', scan_ids)
             )
             return result.data
         except Exception as e:
-            logger.error(f"❌ Failed to get market scans: {e}")
+            logger.error(f"❌ Failed to get market scans by IDs: {e}")
             return []
-    
-    async def search_similar_scans(self, job_title: str, job_description: str) -> List[Dict[str, Any]]:
-        """Search for similar market scans based on job details"""
+
+    async def get_market_scans_by_status(self, status: str, limit: int = 100, columns: str = "*") -> List[Dict[str, Any]]:
+        """Retrieve the most recent market scans with a given status"""
         try:
-            # Simple text search - can be enhanced with vector similarity later
-            # Simple text search using ilike - simplified for now
-            result = (
+            result = await self._execute(
                 self.client
                 .table('market_scans')
-                .select("*")
-                .ilike('job_title', f'%{job_title}%')
-                .limit(10)
-                .execute()
+                .select(columns)
+                .eq('status', status)
+                .order('created_at', desc=True)
+                .limit(limit)
             )
             return result.data
         except Exception as e:
-            logger.error(f"❌ Failed to search similar scans: {e}")
+            logger.error(f"❌ Failed to get {status} market scans: {e}")
             return []
-    
+
+    async def count_market_scans(
+        self,
+        status: str = None,
+        role_category: str = None,
+        client_name: str = None,
+        estimated: bool = False
+    ) -> int:
+        """
+        Count market scans, optionally filtered like get_market_scans.
+        With estimated=True the planner's row estimate is returned instead (pg_class.reltuples for an
+        unfiltered count), which is O(1) but only approximately right.
+        """
+        try:
+            query = self._filter_market_scans(
+                self.client.table('market_scans').select('id', count='planned' if estimated else 'exact', head=True),
+                status, role_category, client_name
+            )
+            
+            result = await self._execute(query)
+            return result.count or 0
+        except Exception as e:
+            logger.error(f"❌ Failed to count market scans: {e}")
+            return 0
+
+    async def get_system_stats_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Get the precomputed dashboard statistics from the mv_system_stats view"""
+        try:
+            result = await self._execute(self.client.table('mv_system_stats').select("*").limit(1))
+            return result.data[0] if result.data else None
+        except Exception as e:
+            logger.error(f"❌ Failed to get system stats snapshot: {e}")
+            return None
+
+    async def get_scan_status_counts(self) -> List[Dict[str, Any]]:
+        """Get scan counts and average processing time grouped by status"""
+        try:
+            result = await self._execute(self.client.rpc('scan_status_counts'))
+            return result.data
+        except Exception as e:
+            logger.error(f"❌ Failed to get scan status counts: {e}")
+            return []
+
+    async def get_top_role_categories(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """Get the most frequent role categories across all scans"""
+        try:
+            result = await self._execute(self.client.rpc('top_role_categories', {'max_results': limit}))
+            return result.data
+        except Exception as e:
+            logger.error(f"❌ Failed to get top role categories: {e}")
+            return []
+
+    async def get_scan_role_distribution(self, status: str) -> List[Dict[str, Any]]:
+        """Get scan counts per role category for scans with a given status"""
+        try:
+            result = await self._execute(self.client.rpc('scan_role_distribution', {'scan_status': status}))
+            return result.data
+        except Exception as e:
+            logger.error(f"❌ Failed to get scan role distribution: {e}")
+            return []
+
+    async def get_scan_region_coverage(self, status: str) -> List[Dict[str, Any]]:
+        """Get how often each region is recommended across scans with a given status"""
+        try:
+            result = await self._execute(self.client.rpc('scan_region_coverage', {'scan_status': status}))
+            return result.data
+        except Exception as e:
+            logger.error(f"❌ Failed to get scan region coverage: {e}")
+            return []
+
+    async def get_skill_frequencies(self, role_category: str, kind: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get the most common skills of one kind (e.g. must_have_skills) for a role"""
+        try:
+            result = await self._execute(
+                self.client.rpc('skill_frequencies', {'role': role_category, 'kind': kind, 'max_results': limit})
+            )
+            return result.data
+        except Exception as e:
+            logger.error(f"❌ Failed to get {kind} frequencies for {role_category}: {e}")
+            return []
+
     # Salary Benchmarks Operations
-    async def get_salary_benchmarks(self, role_category: str, region: str = None) -> List[Dict[str, Any]]:
-        """Get salary benchmarks for a role and region"""
+    async def get_salary_benchmarks(
+        self,
+        role_category: str,
+        region: str = None,
+        experience_levels: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get salary benchmarks for a role, optionally narrowed to a region and experience levels"""
         try:
             query = self.client.table('salary_benchmarks').select("*").eq('role_category', role_category)
             
             if region:
                 query = query.eq('region', region)
+            if experience_levels:
+                query = query.in_('experience_level', experience_levels)
             
-            result = query.execute()
+            result = await self._execute(query)
             return result.data
         except Exception as e:
             logger.error(f"❌ Failed to get salary benchmarks: {e}")
@@ -118,27 +317,51 @@ class DatabaseManager:
     async def create_salary_benchmark(self, benchmark_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new salary benchmark"""
         try:
-            result = self.client.table('salary_benchmarks').insert(benchmark_data).execute()
+            result = await self._execute(self.client.table('salary_benchmarks').insert(benchmark_data))
             return result.data[0]
         except Exception as e:
             logger.error(f"❌ Failed to create salary benchmark: {e}")
             raise
     
-    async def update_market_scan(self, scan_id: str, update_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Update an existing market scan"""
+    async def update_market_scan(
+        self,
+        scan_id: str,
+        update_data: Dict[str, Any],
+        returning: str = 'representation'
+    ) -> Dict[str, Any]:
+        """
+        Update an existing market scan.
+        Pass returning='minimal' when the updated row is not needed, so it is not sent back.
+        """
         try:
-            result = self.client.table('market_scans').update(update_data).eq('id', scan_id).execute()
+            result = await self._execute(
+                self.client.table('market_scans').update(update_data, returning=returning).eq('id', scan_id)
+            )
             logger.info(f"✅ Updated market scan {scan_id}")
             return result.data[0] if result.data else {}
         except Exception as e:
             logger.error(f"❌ Failed to update market scan {scan_id}: {e}")
             raise
     
+    async def delete_market_scan(self, scan_id: str) -> bool:
+        """
+        Delete a market scan (its reports cascade), returning whether it existed.
+        Existence comes from the affected row count, so no separate lookup or row payload is needed.
+        """
+        try:
+            result = await self._execute(
+                self.client.table('market_scans').delete(count='exact', returning='minimal').eq('id', scan_id)
+            )
+            return bool(result.count)
+        except Exception as e:
+            logger.error(f"❌ Failed to delete market scan {scan_id}: {e}")
+            raise
+    
     # Role Management Operations
     async def get_role_mappings(self) -> List[Dict[str, Any]]:
         """Get all role mappings and standardizations"""
         try:
-            result = self.client.table('roles').select("*").execute()
+            result = await self._execute(self.client.table('roles').select("*"))
             return result.data
         except Exception as e:
             logger.error(f"❌ Failed to get role mappings: {e}")
@@ -147,13 +370,12 @@ class DatabaseManager:
     async def find_role_by_title(self, job_title: str) -> Optional[Dict[str, Any]]:
         """Find role mapping by job title"""
         try:
-            result = (
+            result = await self._execute(
                 self.client
                 .table('roles')
                 .select("*")
                 .or_(f"core_role.ilike.%{job_title}%,common_titles.cs.{{{job_title}}}")
                 .limit(1)
-                .execute()
             )
             return result.data[0] if result.data else None
         except Exception as e:
@@ -161,25 +383,138 @@ class DatabaseManager:
             return None
     
     # Candidate Profiles Operations
-    async def get_candidate_profiles(self, role_category: str = None) -> List[Dict[str, Any]]:
-        """Get candidate profiles, optionally filtered by role"""
+    def _candidate_profiles_query(
+        self,
+        table: str,
+        role_category: str = None,
+        region: str = None,
+        max_rate: int = None,
+        limit: int = None,
+        after: Optional[Tuple[str, str]] = None
+    ):
+        """Build a filtered, newest-first keyset query over candidate_profiles or one of its views"""
+        query = self.client.table(table).select("*")
+        
+        if role_category:
+            query = query.eq('role_category', role_category)
+        if region:
+            # ilike without wildcards is a case-insensitive equality match
+            query = query.ilike('region', _escape_like(region))
+        if max_rate:
+            query = query.lte('hourly_rate', max_rate)
+        if after:
+            created_at, row_id = after
+            query = query.or_(
+                f'created_at.lt."{created_at}",'
+                f'and(created_at.eq."{created_at}",id.lt."{row_id}")'
+            )
+        
+        query = query.order('created_at', desc=True).order('id', desc=True)
+        if limit:
+            query = query.limit(limit)
+        return query
+    
+    async def get_candidate_profiles(
+        self,
+        role_category: str = None,
+        region: str = None,
+        max_rate: int = None,
+        limit: int = None,
+        after: Optional[Tuple[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get candidate profiles, optionally filtered by role, region (case-insensitive) and max hourly rate.
+        Results are ordered newest first; pass the (created_at, id) of the last row seen as `after`
+        to continue from it.
+        """
         try:
-            query = self.client.table('candidate_profiles').select("*")
-            
-            if role_category:
-                query = query.eq('role_category', role_category)
-            
-            result = query.execute()
+            result = await self._execute(
+                self._candidate_profiles_query('candidate_profiles', role_category, region, max_rate, limit, after)
+            )
             return result.data
         except Exception as e:
             logger.error(f"❌ Failed to get candidate profiles: {e}")
             return []
     
+    async def get_candidate_listings(
+        self,
+        role_category: str = None,
+        region: str = None,
+        max_rate: int = None,
+        limit: int = None,
+        after: Optional[Tuple[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get candidate profiles from the candidate_listings view, which returns exactly the
+        CandidateProfile fields (plus created_at) with display defaults already filled in.
+        Filtering and pagination match get_candidate_profiles.
+        """
+        try:
+            result = await self._execute(
+                self._candidate_profiles_query('candidate_listings', role_category, region, max_rate, limit, after)
+            )
+            return result.data
+        except Exception as e:
+            logger.error(f"❌ Failed to get candidate listings: {e}")
+            return []
+    
+    async def get_candidates_by_region(
+        self,
+        region: str,
+        role_category: str = None,
+        limit: int = 20,
+        after: Optional[Tuple[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get candidates in a region (case-insensitive), optionally for a role, newest first"""
+        try:
+            params = {'region_name': region, 'role': role_category, 'max_results': limit}
+            if after:
+                params['after_created_at'], params['after_id'] = after
+            
+            result = await self._execute(self.client.rpc('candidate_profiles_in_region', params))
+            return result.data
+        except Exception as e:
+            logger.error(f"❌ Failed to get candidates for region {region}: {e}")
+            return []
+    
+    async def get_candidate_region_insights(self, region: str, role_category: str = None) -> Optional[Dict[str, Any]]:
+        """Get candidate count, hourly rate range, common experience and skills for a region in one query"""
+        try:
+            result = await self._execute(
+                self.client.rpc('candidate_region_insights', {'region_name': region, 'role': role_category})
+            )
+            return result.data[0] if result.data else None
+        except Exception as e:
+            logger.error(f"❌ Failed to get candidate insights for region {region}: {e}")
+            return None
+    
+    async def get_region_diverse_candidates(self, limit: int = 3) -> List[Dict[str, Any]]:
+        """Get up to `limit` candidate profiles, newest first, covering as many regions as possible"""
+        try:
+            result = await self._execute(
+                self.client.rpc('candidate_profiles_region_diverse', {'max_results': limit})
+            )
+            return result.data
+        except Exception as e:
+            logger.error(f"❌ Failed to get region-diverse candidates: {e}")
+            return []
+    
+    async def get_candidates_ranked_for_role(self, role_category: str, limit: int = 3) -> List[Dict[str, Any]]:
+        """Get the best-matching candidates for a role as {'profile': ..., 'matching_score': ...} rows"""
+        try:
+            result = await self._execute(
+                self.client.rpc('candidate_profiles_ranked_for_role', {'role': role_category, 'max_results': limit})
+            )
+            return result.data
+        except Exception as e:
+            logger.error(f"❌ Failed to get ranked candidates for role {role_category}: {e}")
+            return []
+    
     # Generated Reports Operations
     async def save_report_record(self, report_data: Dict[str, Any]) -> Dict[str, Any]:
         """Save generated report record to database"""
         try:
-            result = self.client.table('generated_reports').insert(report_data).execute()
+            result = await self._execute(self.client.table('generated_reports').insert(report_data))
             logger.info(f"✅ Saved report record: {result.data[0]['id']}")
             return result.data[0]
         except Exception as e:
@@ -189,7 +524,7 @@ class DatabaseManager:
     async def get_report_record(self, report_id: str) -> Optional[Dict[str, Any]]:
         """Get report record by ID"""
         try:
-            result = self.client.table('generated_reports').select("*").eq('id', report_id).execute()
+            result = await self._execute(self.client.table('generated_reports').select("*").eq('id', report_id))
             return result.data[0] if result.data else None
         except Exception as e:
             logger.error(f"❌ Failed to get report record {report_id}: {e}")
@@ -198,13 +533,12 @@ class DatabaseManager:
     async def get_scan_reports(self, scan_id: str) -> List[Dict[str, Any]]:
         """Get all reports for a specific scan"""
         try:
-            result = (
+            result = await self._execute(
                 self.client
                 .table('generated_reports')
                 .select("*")
                 .eq('scan_id', scan_id)
                 .order('created_at', desc=True)
-                .execute()
             )
             return result.data
         except Exception as e:
@@ -214,11 +548,10 @@ class DatabaseManager:
     async def get_all_candidate_profiles(self) -> List[Dict[str, Any]]:
         """Get all candidate profiles from database for template generation"""
         try:
-            result = (
+            result = await self._execute(
                 self.client
                 .table('candidate_profiles')
                 .select("*")
-                .execute()
             )
             return result.data
         except Exception as e:
@@ -0,0 +1,36 @@
+"""
+Keyset pagination helpers for Tidal Streamline
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Encode the (created_at, id) position of a row as an opaque URL-safe cursor"""
+    payload = json.dumps([row['created_at'], row['id']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Decode a cursor produced by encode_cursor, raising ValueError if it is malformed.
+    The values end up in a PostgREST filter, so they are returned re-serialized from a parsed
+    timestamp and UUID rather than as the client-supplied strings.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at).isoformat(), str(uuid.UUID(row_id))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def next_page_cursor(rows: list, page_size: int) -> Tuple[list, Optional[str]]:
+    """
+    Split a result fetched with page_size + 1 rows into the page and the cursor for the next one
+    """
+    if len(rows) <= page_size:
+        return rows, None
+    page = rows[:page_size]
+    return page, encode_cursor(page[-1])
@@ -0,0 +1,83 @@
+"""
+Durable task queue (arq on Redis) for Tidal Streamline, plus cache versions shared through the
+same Redis by the API and worker processes
+"""
+
+import asyncio
+from typing import Any, Optional
+from arq import create_pool
+from arq.connections import ArqRedis, RedisSettings
+from loguru import logger
+from app.core.config import settings
+
+def redis_settings() -> RedisSettings:
+    """Connection settings for the queue's Redis, shared by the API and the worker"""
+    if not settings.REDIS_URL:
+        raise ValueError("REDIS_URL environment variable is required")
+    return RedisSettings.from_dsn(settings.REDIS_URL)
+
+# Global queue pool (lazy initialization); stays None when REDIS_URL is not configured
+_pool: Optional[ArqRedis] = None
+_pool_lock = asyncio.Lock()
+
+async def get_task_queue() -> Optional[ArqRedis]:
+    """Get or create the queue pool, or None when jobs should run in-process"""
+    global _pool
+    if not settings.REDIS_URL:
+        return None
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await create_pool(redis_settings())
+                logger.info("✅ Connected to task queue")
+    return _pool
+
+async def enqueue_job(function: str, *args: Any, job_id: Optional[str] = None) -> bool:
+    """
+    Enqueue function for the worker, returning False when no queue is configured or Redis is
+    unreachable so the caller can run it in-process instead. Reusing a job_id that is still
+    queued is a no-op.
+    """
+    try:
+        pool = await get_task_queue()
+        if pool is None:
+            return False
+        await pool.enqueue_job(function, *args, _job_id=job_id)
+        return True
+    except Exception as e:
+        logger.error(f"❌ Failed to enqueue {function}: {e}")
+        return False
+
+def _cache_version_key(name: str) -> str:
+    return f"tidal:cache_version:{name}"
+
+async def get_cache_version(name: str) -> int:
+    """
+    Current version of a cache kept in every process; include it in cache keys so a bump from
+    any process makes older entries unreachable. Always 0 when no queue is configured, and
+    also when Redis is unreachable, in which case entries only expire by their TTL.
+    """
+    try:
+        pool = await get_task_queue()
+        if pool is None:
+            return 0
+        return int(await pool.get(_cache_version_key(name)) or 0)
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to read cache version {name}: {e}")
+        return 0
+
+async def bump_cache_version(name: str) -> None:
+    """Invalidate a cache in every process that keys it by get_cache_version(name)"""
+    try:
+        pool = await get_task_queue()
+        if pool is not None:
+            await pool.incr(_cache_version_key(name))
+    except Exception as e:
+        logger.error(f"❌ Failed to bump cache version {name}: {e}")
+
+async def close_task_queue() -> None:
+    """Close the queue pool if one was opened"""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
@@ -144,6 +144,7 @@ class MarketScanList(BaseModel):
     page: int
     page_size: int
     has_next: bool
+    next_cursor: Optional[str] = None
 
 # Database Models
 class MarketScanDB(BaseModel):
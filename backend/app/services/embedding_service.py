@@ -6,17 +6,22 @@ import asyncio
 from typing import List, Dict, Any, Optional, Tuple
 import openai
 from pinecone import Pinecone, ServerlessSpec
+from app.core.cache import TTLCache
 from app.core.config import settings
 from loguru import logger
 import hashlib
 import json
 
+# One scan embeds the same posting text for the analysis cache, the similar-scan search and the
+# vector upsert; memoizing per text turns that into a single OpenAI call
+EMBEDDING_CACHE_TTL_SECONDS = 3600
 
 class EmbeddingService:
     """Service for generating embeddings and managing vector operations"""
     
     def __init__(self):
         """Initialize OpenAI and Pinecone clients"""
+        self._embedding_cache = TTLCache(maxsize=256, ttl=EMBEDDING_CACHE_TTL_SECONDS)
         try:
             # Initialize OpenAI client
             self.openai_client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
@@ -70,26 +75,35 @@ class EmbeddingService:
             raise
     
     async def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for a single text"""
+        """
+        Generate embedding for a single text.
+        Embeddings are memoized per cleaned text; callers must not mutate the returned list.
+        """
         try:
             # Clean and prepare text
             clean_text = self._clean_text_for_embedding(text)
             
-            # Generate embedding
-            response = self.openai_client.embeddings.create(
-                model=self.embedding_model,
-                input=clean_text
+            return await self._embedding_cache.get_or_set(
+                clean_text, lambda: self._create_embedding(clean_text)
             )
             
-            embedding = response.data[0].embedding
-            logger.debug(f"Generated embedding with dimension: {len(embedding)}")
-            
-            return embedding
-            
         except Exception as e:
             logger.error(f"Failed to generate embedding: {str(e)}")
             raise
     
+    async def _create_embedding(self, clean_text: str) -> List[float]:
+        # Generate embedding in a worker thread; the OpenAI client is blocking
+        response = await asyncio.to_thread(
+            self.openai_client.embeddings.create,
+            model=self.embedding_model,
+            input=clean_text
+        )
+        
+        embedding = response.data[0].embedding
+        logger.debug(f"Generated embedding with dimension: {len(embedding)}")
+        
+        return embedding
+    
     async def generate_batch_embeddings(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for multiple texts"""
         try:
@@ -167,8 +181,9 @@ class EmbeddingService:
             if metadata:
                 vector_metadata.update(metadata)
             
-            # Upsert to Pinecone
-            self.index.upsert(
+            # Upsert to Pinecone in a worker thread; the client is blocking
+            await asyncio.to_thread(
+                self.index.upsert,
                 vectors=[
                     {
                         "id": scan_id,
@@ -206,10 +221,13 @@ class EmbeddingService:
             if exclude_scan_id:
                 filter_dict = {"scan_id": {"$ne": exclude_scan_id}}
             
-            # Query Pinecone
-            query_response = self.index.query(
+            # Query Pinecone in a worker thread, the client is blocking; the index ranks by
+            # similarity and the filter already drops the excluded scan, so exactly top_k
+            # matches are needed
+            query_response = await asyncio.to_thread(
+                self.index.query,
                 vector=query_embedding,
-                top_k=top_k + (1 if exclude_scan_id else 0),  # Get extra in case we need to exclude
+                top_k=top_k,
                 include_metadata=True,
                 filter=filter_dict if filter_dict else None
             )
@@ -217,9 +235,9 @@ class EmbeddingService:
             # Process results
             similar_scans = []
             for match in query_response.matches:
-                # Skip if below similarity threshold
+                # Matches come back in descending score order, so the rest are below the threshold too
                 if match.score < similarity_threshold:
-                    continue
+                    break
                 
                 # Skip if this is the excluded scan (double-check)
                 if exclude_scan_id and match.id == exclude_scan_id:
@@ -242,9 +260,6 @@ class EmbeddingService:
                 
                 similar_scans.append(similar_scan)
             
-            # Limit to requested number
-            similar_scans = similar_scans[:top_k]
-            
             logger.info(f"Found {len(similar_scans)} similar scans above threshold {similarity_threshold}")
             return similar_scans
             
@@ -7,6 +7,7 @@ import os
 import json
 from typing import Dict, Any, List, Tuple, Optional
 from datetime import datetime
+from app.core.ai_service import create_chat_completion
 from app.models.market_scan import JobAnalysis, RoleCategory, ExperienceLevel, Region
 from app.services.vector_search import vector_search_service
 from loguru import logger
@@ -24,7 +25,8 @@ class JobAnalyzer:
         prompt = self._create_analysis_prompt(job_title, job_description, hiring_challenges)
         
         try:
-            response = self.client.chat.completions.create(
+            response = await create_chat_completion(
+                self.client,
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
@@ -274,4 +276,7 @@ Focus on practical analysis based on the specific requirements mentioned."""
             recommended_regions=[Region.PHILIPPINES, Region.LATIN_AMERICA],
             unique_challenges="Standard remote role requirements",
             salary_factors=["Experience level", "Technical skills", "Industry knowledge"]
-        )
\ No newline at end of file
+        )
+
+# Create global instance
+job_analyzer = JobAnalyzer()
@@ -4,14 +4,12 @@ Salary Calculator Service - Regional salary calculations and recommendations
 
 from typing import Dict, List, Optional
 from app.models.market_scan import SalaryRange, SalaryRecommendations, MarketInsights, JobAnalysis, Region, RoleCategory
-from app.core.database import get_supabase_client
+from app.core.database import get_database
 
 class SalaryCalculator:
     """Regional salary calculator and recommendations service"""
     
     def __init__(self):
-        self.supabase = get_supabase_client()
-        
         # Regional savings percentages vs US baseline
         self.regional_savings = {
             Region.UNITED_STATES: 0,
@@ -71,12 +69,14 @@ class SalaryCalculator:
         exp_levels = exp_map.get(experience_level, ["2-4 years"])
         
         try:
-            response = self.supabase.table('salary_benchmarks').select('*').eq(
-                'role_category', role_category.value
-            ).in_('experience_level', exp_levels).execute()
+            # The database manager runs the query off the event loop (and returns [] on failure)
+            rows = await get_database().get_salary_benchmarks(
+                role_category.value,
+                experience_levels=exp_levels
+            )
             
             salary_data = {}
-            for row in response.data:
+            for row in rows:
                 region = Region(row['region'])
                 salary_data[region] = SalaryRange(
                     low=row['salary_low'],
@@ -186,4 +186,7 @@ class SalaryCalculator:
             high_demand_regions=high_demand or ["Philippines", "Latin America"],
             competitive_factors=competitive_factors or ["Standard market competition"],
             cost_efficiency=cost_efficiency
-        )
\ No newline at end of file
+        )
+
+# Create global instance
+salary_calculator = SalaryCalculator()
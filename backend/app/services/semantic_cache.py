@@ -0,0 +1,88 @@
+"""
+Semantic Cache - Reuse results for near-duplicate inputs by embedding similarity
+"""
+
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+
+from app.core.config import settings
+
+
+class SemanticCache:
+    """
+    Bounded LRU cache keyed on embedding similarity instead of exact keys.
+
+    Entries live in a preallocated (max_size, d) matrix of unit vectors, so a lookup
+    is a single matrix-vector product followed by an argmax.
+    """
+
+    def __init__(self, max_size: int = 512, threshold: float = 0.92, dimension: int = settings.EMBEDDING_DIMENSION):
+        self.max_size = max_size
+        self.threshold = threshold
+        self._matrix = np.zeros((max_size, dimension), dtype=np.float32)
+        self._payloads: List[Any] = [None] * max_size
+        self._last_used = np.zeros(max_size, dtype=np.int64)
+        self._size = 0
+        self._clock = 0
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> Optional[np.ndarray]:
+        """Return the embedding as a float32 unit vector, or None for a zero vector"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if not norm:
+            return None
+        return vector / norm
+
+    def _touch(self, slot: int) -> None:
+        self._clock += 1
+        self._last_used[slot] = self._clock
+
+    def get(self, embedding: Sequence[float]) -> Optional[Any]:
+        """Return the payload of the most similar entry if it clears the threshold"""
+        if not self._size:
+            return None
+
+        query = self._normalize(embedding)
+        if query is None:
+            return None
+
+        scores = self._matrix[:self._size] @ query
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+
+        self._touch(best)
+        logger.debug(f"Semantic cache hit with similarity {scores[best]:.3f}")
+        return self._payloads[best]
+
+    def set(self, embedding: Sequence[float], payload: Any) -> None:
+        """Store payload under embedding, evicting the least recently used entry when full"""
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+
+        if self._size < self.max_size:
+            slot = self._size
+            self._size += 1
+        else:
+            slot = int(np.argmin(self._last_used))
+
+        self._matrix[slot] = vector
+        self._payloads[slot] = payload
+        self._touch(slot)
+
+    def clear(self) -> None:
+        """Drop every cached entry"""
+        self._payloads = [None] * self.max_size
+        self._last_used[:] = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+
+# Global job analysis cache: hiring challenges -> (job_analysis, similar_scans, confidence_score) per posting
+job_analysis_cache = SemanticCache()
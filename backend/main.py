@@ -6,14 +6,17 @@ Main FastAPI application server
 
 import os
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from loguru import logger
 from dotenv import load_dotenv
 
 from app.core.config import settings
 from app.api.v1.endpoints import market_scans, analysis, recommendations, admin, candidates, reports
+from app.core.task_queue import close_task_queue
+from app.services.job_analyzer import job_analyzer
 
 # Load environment variables
 load_dotenv()
@@ -28,6 +31,9 @@ async def lifespan(app: FastAPI):
     yield
     
     logger.info("⏹️  Tidal Streamline API shutting down...")
+    # Release the shared analyzer's pooled OpenAI connections
+    job_analyzer.client.close()
+    await close_task_queue()
 
 # Create FastAPI application
 app = FastAPI(
@@ -35,6 +41,7 @@ app = FastAPI(
     description="Market Scan Automation System for Global Recruiting",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs" if settings.DEBUG_MODE else None,
     redoc_url="/redoc" if settings.DEBUG_MODE else None,
 )
@@ -59,6 +66,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses (CSV exports, candidate lists); level 1 keeps the CPU cost low
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=1)
+
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """Log unexpected errors and return a 500 in the same shape as endpoint HTTPExceptions"""
+    logger.error(f"❌ Unhandled error on {request.method} {request.url.path}: {exc}")
+    return ORJSONResponse(
+        status_code=500,
+        content={"detail": f"Internal server error: {str(exc)}"}
+    )
+
 # API Routes
 app.include_router(
     market_scans.router,
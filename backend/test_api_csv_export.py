@@ -110,7 +110,7 @@ async def test_api_endpoint():
         print(f"📎 Content-Disposition: {csv_response.headers.get('Content-Disposition', 'Not set')}")
         
         # Check CSV content
-        csv_content = csv_response.body.decode('utf-8')
+        csv_content = ''.join([chunk async for chunk in csv_response.body_iterator])
         lines = csv_content.split('\n')
         
         print(f"📊 CSV Analysis:")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test the encoding of the template CSV exports against csv.reader
+"""
+
+import csv
+import io
+import os
+import sys
+
+# Add backend directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.api.v1.endpoints.export import create_csv_content
+
+TEMPLATE_DATA = {
+    'company_domain': 'acme.com',
+    'job_title': 'Analyst, Marketing',
+    'tagline': 'The "best" hire',
+    'duties': 'Reporting\nForecasting',
+    'empty_value': '',
+}
+
+def read_rows(content: str):
+    return list(csv.reader(io.StringIO(content, newline='')))
+
+def test_template_csv_rows():
+    """Rows are sorted by variable, quoted where needed and terminated with CRLF"""
+    content = create_csv_content(TEMPLATE_DATA)
+    assert content.startswith('Variable,Value\r\n'), content[:20]
+    assert content.endswith('\r\n')
+    assert '"Analyst, Marketing"' in content
+    assert '"The ""best"" hire"' in content
+
+    rows = read_rows(content)
+    assert rows[0] == ['Variable', 'Value']
+    assert [row[0] for row in rows[1:]] == sorted(TEMPLATE_DATA)
+    print("✅ Template CSV rows are sorted, quoted and CRLF-terminated")
+
+def test_template_csv_values_round_trip():
+    """Values read back unchanged, with line feeds written as literal \\n escapes"""
+    rows = dict(read_rows(create_csv_content(TEMPLATE_DATA))[1:])
+    assert rows['job_title'] == 'Analyst, Marketing'
+    assert rows['tagline'] == 'The "best" hire'
+    assert rows['duties'] == 'Reporting\\nForecasting'
+    assert rows['empty_value'] == ''
+    print("✅ Template CSV values round-trip through csv.reader")
+
+def test_template_csv_carriage_return_is_quoted():
+    """Only line feeds are escaped; a carriage return is kept and the field quoted"""
+    content = create_csv_content({'note': 'Line one\rLine two'})
+    assert 'note,"Line one\rLine two"\r\n' in content, repr(content)
+    assert dict(read_rows(content)[1:])['note'] == 'Line one\rLine two'
+    print("✅ Carriage returns are quoted, not escaped")
+
+if __name__ == "__main__":
+    print("🧪 Testing template CSV formatting...")
+    test_template_csv_rows()
+    test_template_csv_values_round_trip()
+    test_template_csv_carriage_return_is_quoted()
+    print("\n🎉 CSV Formatting Test Complete!")
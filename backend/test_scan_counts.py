@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test when the market scan listing total is exact, estimated or cached
+"""
+
+import asyncio
+import os
+import sys
+
+# Add backend directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.api.v1.endpoints import market_scans
+
+class FakeDatabase:
+    """Answers count_market_scans with a fixed estimate and exact count, recording each call"""
+
+    def __init__(self, estimate: int, exact: int):
+        self.estimate = estimate
+        self.exact = exact
+        self.calls = []
+
+    async def count_market_scans(self, estimated: bool = False, **filters) -> int:
+        self.calls.append('estimated' if estimated else 'exact')
+        return self.estimate if estimated else self.exact
+
+def count_with(db: FakeDatabase, **filters) -> int:
+    market_scans._scan_count_cache.clear()
+    market_scans.get_database = lambda: db
+    filters = {'status': None, 'role_category': None, 'client_name': None, **filters}
+    return asyncio.run(market_scans.count_scans(**filters))
+
+def test_small_table_counts_exactly():
+    """A small or never-analyzed table gets an exact total, whatever the planner estimates"""
+    for estimate in (-1, 0, 40, 9999):
+        db = FakeDatabase(estimate=estimate, exact=12)
+        assert count_with(db) == 12, f"Expected the exact count for estimate {estimate}"
+        assert db.calls == ['estimated', 'exact'], db.calls
+    print("✅ Small tables are counted exactly")
+
+def test_large_table_uses_estimate():
+    """A large unfiltered total is the planner's estimate and is not recounted"""
+    db = FakeDatabase(estimate=250000, exact=249871)
+    assert count_with(db) == 250000
+    assert db.calls == ['estimated'], db.calls
+    print("✅ Large unfiltered totals use the estimate")
+
+def test_filtered_counts_are_exact():
+    """Filtered totals are always exact"""
+    db = FakeDatabase(estimate=250000, exact=37)
+    assert count_with(db, status='completed') == 37
+    assert db.calls == ['exact'], db.calls
+    print("✅ Filtered totals are exact")
+
+def test_only_large_totals_are_cached():
+    """Small totals are recounted on every request; large ones are served from the cache"""
+    small = FakeDatabase(estimate=5, exact=5)
+    count_with(small)
+    asyncio.run(market_scans.count_scans(status=None, role_category=None, client_name=None))
+    assert small.calls == ['estimated', 'exact'] * 2, small.calls
+
+    large = FakeDatabase(estimate=250000, exact=249871)
+    count_with(large)
+    asyncio.run(market_scans.count_scans(status=None, role_category=None, client_name=None))
+    assert large.calls == ['estimated'], large.calls
+    print("✅ Only large totals are cached")
+
+if __name__ == "__main__":
+    print("🧪 Testing market scan counts...")
+    test_small_table_counts_exactly()
+    test_large_table_uses_estimate()
+    test_filtered_counts_are_exact()
+    test_only_large_totals_are_cached()
+    print("\n🎉 Market Scan Count Test Complete!")
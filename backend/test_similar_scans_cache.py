@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test that cached similar-scan results are invalidated within and across processes
+"""
+
+import asyncio
+import os
+import sys
+
+# Add backend directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core import task_queue
+from app.core.config import settings
+from app.api.v1.endpoints import market_scans
+
+class FakeRedis:
+    """The slice of the queue's Redis client used for cache versions"""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+class FakeDatabase:
+    async def get_market_scan(self, scan_id):
+        return {'job_title': 'Data Analyst', 'job_description': 'Builds dashboards'}
+
+searches = []
+
+async def fake_find_similar_market_scans(**kwargs):
+    searches.append(kwargs['current_scan_id'])
+    return [{'scan_id': 'other-scan'}], 0.8
+
+def setup(redis_url, pool):
+    searches.clear()
+    market_scans._similar_scans_cache.clear()
+    market_scans.get_database = lambda: FakeDatabase()
+    market_scans.vector_search_service.find_similar_market_scans = fake_find_similar_market_scans
+    settings.REDIS_URL = redis_url
+    task_queue._pool = pool
+
+def read_similar():
+    return asyncio.run(market_scans.get_similar_scans('scan-1', limit=5, similarity_threshold=0.7))
+
+def test_results_are_cached():
+    """Repeated reads share one search"""
+    setup(None, None)
+    read_similar()
+    read_similar()
+    assert searches == ['scan-1'], searches
+    print("✅ Similar scans are cached")
+
+def test_local_invalidation_without_redis():
+    """Without Redis everything runs in one process, and invalidating clears the local cache"""
+    setup(None, None)
+    read_similar()
+    asyncio.run(market_scans.invalidate_similar_scans())
+    read_similar()
+    assert searches == ['scan-1', 'scan-1'], searches
+    print("✅ Local invalidation clears the cache")
+
+def test_invalidation_from_another_process():
+    """A version bump from the worker process makes this process search again"""
+    setup('redis://localhost:6379', FakeRedis())
+    read_similar()
+    read_similar()
+    assert searches == ['scan-1'], searches
+
+    # The worker only shares Redis with this process, not its in-memory cache
+    asyncio.run(task_queue.bump_cache_version(market_scans.SIMILAR_SCANS_CACHE_VERSION))
+    read_similar()
+    assert searches == ['scan-1', 'scan-1'], searches
+    print("✅ Invalidation in another process reaches this one")
+
+if __name__ == "__main__":
+    print("🧪 Testing similar-scan cache invalidation...")
+    test_results_are_cached()
+    test_local_invalidation_without_redis()
+    test_invalidation_from_another_process()
+    print("\n🎉 Similar Scans Cache Test Complete!")
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Tidal Streamline - Background worker for market scan analysis
+Run as a separate service: arq workers.WorkerSettings
+"""
+
+from typing import Any, Dict
+from dotenv import load_dotenv
+from loguru import logger
+
+from app.core.task_queue import redis_settings
+from app.models.market_scan import MarketScanRequest
+from app.api.v1.endpoints.market_scans import process_market_scan_analysis as run_market_scan_analysis
+from app.services.job_analyzer import job_analyzer
+
+# Load environment variables
+load_dotenv()
+
+async def process_market_scan_analysis(ctx: Dict[str, Any], scan_id: str, request_data: Dict[str, Any]) -> None:
+    """
+    Run the analysis for a market scan enqueued by POST /market-scans/analyze
+    """
+    await run_market_scan_analysis(scan_id, MarketScanRequest.model_validate(request_data))
+
+async def shutdown(ctx: Dict[str, Any]) -> None:
+    """Release the shared analyzer's pooled OpenAI connections"""
+    logger.info("⏹️  Tidal Streamline worker shutting down...")
+    job_analyzer.client.close()
+
+class WorkerSettings:
+    """arq worker configuration"""
+    functions = [process_market_scan_analysis]
+    redis_settings = redis_settings()
+    on_shutdown = shutdown
+    # Each job is mostly waiting on OpenAI, Pinecone and Supabase
+    max_jobs = 10
+    # Analyses make several LLM calls; well above the slowest seen in practice
+    job_timeout = 600
@@ -0,0 +1,6 @@
+-- Migration: Add composite index for filtered candidate listings
+-- Date: 2026-10-16
+-- Purpose: Let role, region and max hourly rate filters on candidate_profiles run as one index range scan
+
+CREATE INDEX IF NOT EXISTS idx_candidate_profiles_role_region_rate
+    ON candidate_profiles (role_category, region, hourly_rate);
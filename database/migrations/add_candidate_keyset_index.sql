@@ -0,0 +1,6 @@
+-- Migration: Add keyset pagination index for candidate profiles
+-- Date: 2026-10-16
+-- Purpose: Serve cursor-paginated candidate listings (newest first) from an index instead of sorting
+
+CREATE INDEX IF NOT EXISTS idx_candidate_profiles_created_id
+    ON candidate_profiles (created_at DESC, id DESC);
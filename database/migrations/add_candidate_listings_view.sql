@@ -0,0 +1,27 @@
+-- Migration: Add candidate listings view
+-- Date: 2026-10-16
+-- Purpose: Return candidate list rows with display defaults filled in so the API can serialize them as-is
+
+-- Exactly the CandidateProfile response fields, never NULL where the response requires a value,
+-- plus created_at for keyset pagination. A simple view, so filters and ordering still use
+-- the candidate_profiles indexes.
+CREATE OR REPLACE VIEW candidate_listings AS
+SELECT
+    id,
+    name,
+    role_category,
+    COALESCE(experience_years, '') AS experience_years,
+    region,
+    skills,
+    COALESCE(bio, '') AS bio,
+    video_url,
+    resume_url,
+    portfolio_url,
+    hourly_rate,
+    COALESCE(availability, 'Available') AS availability,
+    COALESCE(english_proficiency, 'Fluent') AS english_proficiency,
+    COALESCE(timezone, 'UTC') AS timezone,
+    created_at
+FROM candidate_profiles;
+
+COMMENT ON VIEW candidate_listings IS 'Candidate profiles shaped for the candidate list endpoint';
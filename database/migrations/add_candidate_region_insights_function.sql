@@ -0,0 +1,42 @@
+-- Migration: Add regional insight aggregate for candidate profiles
+-- Date: 2026-10-16
+-- Purpose: Compute regional candidate statistics in one round-trip instead of from the returned page in Python
+
+-- Candidate count, hourly rate range, most common experience band and most common skills for a
+-- region (case-insensitive), optionally for a role. Dropped first because the result columns changed.
+DROP FUNCTION IF EXISTS candidate_region_insights(TEXT, TEXT);
+
+CREATE OR REPLACE FUNCTION candidate_region_insights(
+    region_name TEXT,
+    role TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    total_candidates BIGINT,
+    rate_min INTEGER,
+    rate_max INTEGER,
+    rate_avg INTEGER,
+    common_experience TEXT,
+    common_skills TEXT[]
+) AS $$
+    WITH regional AS (
+        SELECT hourly_rate, experience_years, skills
+        FROM candidate_profiles
+        WHERE lower(region) = lower(region_name)
+          AND (role IS NULL OR lower(role_category) = lower(role))
+    )
+    SELECT
+        (SELECT COUNT(*) FROM regional),
+        (SELECT MIN(hourly_rate) FROM regional WHERE hourly_rate > 0),
+        (SELECT MAX(hourly_rate) FROM regional WHERE hourly_rate > 0),
+        (SELECT FLOOR(AVG(hourly_rate))::INTEGER FROM regional WHERE hourly_rate > 0),
+        (SELECT MODE() WITHIN GROUP (ORDER BY experience_years) FROM regional WHERE experience_years <> ''),
+        ARRAY(
+            SELECT skill
+            FROM regional, unnest(skills) AS skill
+            GROUP BY skill
+            ORDER BY COUNT(*) DESC
+            LIMIT 5
+        );
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION candidate_region_insights(TEXT, TEXT) IS 'Aggregate statistics for candidates in a region, used by the regional candidates endpoint';
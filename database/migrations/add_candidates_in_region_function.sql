@@ -0,0 +1,31 @@
+-- Migration: Add region lookup function for candidate profiles
+-- Date: 2026-10-16
+-- Purpose: Filter candidates by region and role case-insensitively in one indexed, keyset-paginated query
+
+-- Expression index matching the lower(region) predicate, ordered for newest-first pagination
+CREATE INDEX IF NOT EXISTS idx_candidate_profiles_lower_region_created
+    ON candidate_profiles (lower(region), created_at DESC, id DESC);
+
+-- Candidates in a region (case-insensitive), optionally for a role, newest first.
+-- Pass the created_at/id of the last row seen to fetch the following page.
+CREATE OR REPLACE FUNCTION candidate_profiles_in_region(
+    region_name TEXT,
+    role TEXT DEFAULT NULL,
+    max_results INTEGER DEFAULT 20,
+    after_created_at TIMESTAMPTZ DEFAULT NULL,
+    after_id UUID DEFAULT NULL
+)
+RETURNS SETOF candidate_profiles AS $$
+    SELECT *
+    FROM candidate_profiles
+    WHERE lower(region) = lower(region_name)
+      AND (role IS NULL OR lower(role_category) = lower(role))
+      AND (
+          after_created_at IS NULL
+          OR (created_at, id) < (after_created_at, after_id)
+      )
+    ORDER BY created_at DESC, id DESC
+    LIMIT max_results;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION candidate_profiles_in_region(TEXT, TEXT, INTEGER, TIMESTAMPTZ, UUID) IS 'Case-insensitive, keyset-paginated candidate lookup by region and optional role';
@@ -0,0 +1,35 @@
+-- Migration: Add ranked candidate lookup for a role
+-- Date: 2026-10-16
+-- Purpose: Score, sort and limit role candidates in Postgres instead of loading and sorting them in the API
+
+-- Best-matching candidates for a role. The score mirrors calculate_role_match_score in
+-- backend/app/api/v1/endpoints/candidates.py: 0.8 for a role match (0.4 otherwise) plus an
+-- experience bonus for the first band experience_years contains (free text such as
+-- "Senior (5-8 years)"), capped at 1.0.
+CREATE OR REPLACE FUNCTION candidate_profiles_ranked_for_role(
+    role TEXT,
+    max_results INTEGER DEFAULT 3
+)
+RETURNS TABLE (
+    profile JSONB,
+    matching_score DOUBLE PRECISION
+) AS $$
+    SELECT
+        to_jsonb(c) AS profile,
+        LEAST(
+            CASE WHEN c.role_category = role THEN 0.8 ELSE 0.4 END
+            + CASE
+                WHEN strpos(COALESCE(c.experience_years, ''), '5-8') > 0
+                  OR strpos(COALESCE(c.experience_years, ''), '9+') > 0 THEN 0.15
+                WHEN strpos(COALESCE(c.experience_years, ''), '3-6') > 0 THEN 0.1
+                ELSE 0
+              END,
+            1.0
+        ) AS matching_score
+    FROM candidate_profiles c
+    WHERE c.role_category = role
+    ORDER BY matching_score DESC, c.created_at DESC
+    LIMIT max_results;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION candidate_profiles_ranked_for_role(TEXT, INTEGER) IS 'Role candidates ordered by match score for the candidates-for-role endpoint';
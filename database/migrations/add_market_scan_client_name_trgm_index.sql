@@ -0,0 +1,11 @@
+-- Migration: Add trigram index for market scan client name search
+-- Date: 2026-10-16
+-- Purpose: Serve the case-insensitive partial client_name filter of the scan listing from an index
+-- Note: CREATE INDEX CONCURRENTLY cannot run inside a transaction block; run this file on its own
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Supports client_name ILIKE '%...%'; status and role_category filters use the existing
+-- idx_market_scans_status / idx_market_scans_role_category indexes (schema.sql)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_market_scans_client_name_trgm
+    ON market_scans USING GIN (client_name gin_trgm_ops);
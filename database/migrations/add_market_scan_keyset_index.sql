@@ -0,0 +1,8 @@
+-- Migration: Add keyset pagination index for market scan listings
+-- Date: 2026-10-16
+-- Purpose: Serve cursor-paginated scan listings from one index range scan, independent of page depth
+-- Note: CREATE INDEX CONCURRENTLY cannot run inside a transaction block; run this file on its own
+
+-- Matches ORDER BY created_at DESC, id DESC and the (created_at, id) < cursor predicate
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_market_scans_created_id
+    ON market_scans (created_at DESC, id DESC);
@@ -0,0 +1,12 @@
+-- Migration: Add primary region computed column for market scans
+-- Date: 2026-10-16
+-- Purpose: Let the market scan listing select its summary projection instead of whole rows
+
+-- PostgREST exposes functions taking a table row as computed columns, so the listing can
+-- select primary_region alongside the real columns
+CREATE OR REPLACE FUNCTION primary_region(market_scans)
+RETURNS TEXT AS $$
+    SELECT $1.recommended_regions[1];
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION primary_region(market_scans) IS 'First recommended region of a market scan, for the market scan listing';
@@ -0,0 +1,38 @@
+-- Migration: Add aggregate functions for the admin statistics dashboard
+-- Date: 2026-10-16
+-- Purpose: Compute scan statistics in Postgres instead of fetching every scan row into the API
+
+-- Per-status scan counts with processing time averages
+CREATE OR REPLACE FUNCTION scan_status_counts()
+RETURNS TABLE (
+    status VARCHAR(20),
+    scan_count BIGINT,
+    timed_count BIGINT,
+    avg_processing_time DOUBLE PRECISION
+) AS $$
+    SELECT
+        status,
+        COUNT(*) AS scan_count,
+        COUNT(processing_time_seconds) AS timed_count,
+        AVG(processing_time_seconds) AS avg_processing_time
+    FROM market_scans
+    GROUP BY status;
+$$ LANGUAGE sql STABLE;
+
+-- Most frequent role categories across all scans
+CREATE OR REPLACE FUNCTION top_role_categories(max_results INTEGER DEFAULT 5)
+RETURNS TABLE (
+    role VARCHAR(100),
+    count BIGINT
+) AS $$
+    SELECT
+        COALESCE(role_category, 'Unknown') AS role,
+        COUNT(*) AS count
+    FROM market_scans
+    GROUP BY COALESCE(role_category, 'Unknown')
+    ORDER BY count DESC
+    LIMIT max_results;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION scan_status_counts() IS 'Scan counts and average processing time grouped by status for the admin dashboard';
+COMMENT ON FUNCTION top_role_categories(INTEGER) IS 'Most common role categories for the admin dashboard';
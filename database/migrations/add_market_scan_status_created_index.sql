@@ -0,0 +1,11 @@
+-- Migration: Add composite index for status-filtered market scan listings
+-- Date: 2026-10-16
+-- Purpose: Serve "latest scans with status X" queries from one index range scan instead of filter + sort
+-- Note: CREATE INDEX CONCURRENTLY cannot run inside a transaction block; run this file on its own
+
+-- Admin endpoints filter on status and order by created_at DESC
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_market_scans_status_created
+    ON market_scans (status, created_at DESC);
+
+-- role_category filters are already covered by idx_market_scans_role_category (schema.sql).
+-- complexity_score is only projected from job_analysis, never filtered on, so no expression index is added.
@@ -0,0 +1,16 @@
+-- Migration: Store market scan summary fields as columns
+-- Date: 2026-10-16
+-- Purpose: Let the market scan listing select flat columns instead of extracting them from analysis results
+
+ALTER TABLE market_scans
+ADD COLUMN IF NOT EXISTS recommended_pay_band VARCHAR(20),
+ADD COLUMN IF NOT EXISTS primary_region TEXT;
+
+-- The computed column served the listing until now; a real column of the same name replaces it
+DROP FUNCTION IF EXISTS primary_region(market_scans);
+
+-- Backfill scans analyzed before the columns existed (new analyses set them when they complete)
+UPDATE market_scans SET
+  recommended_pay_band = salary_recommendations->>'recommended_pay_band',
+  primary_region = recommended_regions[1]
+WHERE salary_recommendations IS NOT NULL OR recommended_regions IS NOT NULL;
@@ -0,0 +1,20 @@
+-- Migration: Add region-diverse candidate selection function
+-- Date: 2026-10-16
+-- Purpose: Pick the template candidates for CSV exports in the database instead of fetching every profile
+
+-- Newest candidate of each region first, then the remaining candidates newest first, so a
+-- small limit covers as many regions as possible
+CREATE OR REPLACE FUNCTION candidate_profiles_region_diverse(
+    max_results INTEGER DEFAULT 3
+)
+RETURNS SETOF candidate_profiles AS $$
+    SELECT *
+    FROM candidate_profiles
+    ORDER BY
+        ROW_NUMBER() OVER (PARTITION BY region ORDER BY created_at DESC, id DESC) = 1 DESC,
+        created_at DESC,
+        id DESC
+    LIMIT max_results;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION candidate_profiles_region_diverse(INTEGER) IS 'One candidate per region first, for the CSV export template profiles';
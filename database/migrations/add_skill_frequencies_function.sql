@@ -0,0 +1,31 @@
+-- Migration: Add skill frequency aggregate for role skill insights
+-- Date: 2026-10-16
+-- Purpose: Count the most common skills per role in Postgres instead of aggregating scan rows in the API
+
+-- Most frequent skills of one kind (e.g. must_have_skills) across scans for a role
+CREATE OR REPLACE FUNCTION skill_frequencies(
+    role TEXT,
+    kind TEXT,
+    max_results INTEGER DEFAULT 10
+)
+RETURNS TABLE (
+    skill TEXT,
+    freq BIGINT
+) AS $$
+    SELECT
+        skill,
+        COUNT(*) AS freq
+    FROM market_scans,
+        jsonb_array_elements_text(
+            CASE WHEN jsonb_typeof(job_analysis->kind) = 'array'
+                 THEN job_analysis->kind
+                 ELSE '[]'::jsonb
+            END
+        ) AS skill
+    WHERE role_category = role
+    GROUP BY skill
+    ORDER BY freq DESC
+    LIMIT max_results;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION skill_frequencies(TEXT, TEXT, INTEGER) IS 'Most common skills of a given kind for a role category';
@@ -0,0 +1,35 @@
+-- Migration: Add materialized view for the admin statistics dashboard
+-- Date: 2026-10-16
+-- Purpose: Precompute system statistics once a minute so dashboard polling reads a single row
+-- Requires: pg_cron extension (enable it under Database > Extensions in Supabase)
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_system_stats AS
+SELECT
+    1 AS id,
+    COUNT(*) AS total_scans,
+    COUNT(*) FILTER (WHERE status = 'completed') AS completed_scans,
+    COUNT(*) FILTER (WHERE status = 'pending') AS pending_scans,
+    COUNT(*) FILTER (WHERE status = 'failed') AS failed_scans,
+    COALESCE(AVG(processing_time_seconds), 0)::DOUBLE PRECISION AS average_processing_time,
+    COALESCE(
+        (
+            SELECT jsonb_agg(jsonb_build_object('role', role, 'count', count) ORDER BY count DESC)
+            FROM top_role_categories(5)
+        ),
+        '[]'::jsonb
+    ) AS top_role_categories,
+    NOW() AS refreshed_at
+FROM market_scans;
+
+-- REFRESH ... CONCURRENTLY needs a unique index on the view
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_system_stats_id ON mv_system_stats (id);
+
+-- Refresh every minute without blocking readers
+CREATE EXTENSION IF NOT EXISTS pg_cron;
+SELECT cron.schedule(
+    'refresh_mv_system_stats',
+    '* * * * *',
+    'REFRESH MATERIALIZED VIEW CONCURRENTLY mv_system_stats'
+);
+
+COMMENT ON MATERIALIZED VIEW mv_system_stats IS 'Admin dashboard statistics, refreshed every minute by pg_cron';
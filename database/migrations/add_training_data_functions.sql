@@ -0,0 +1,42 @@
+-- Migration: Add aggregate functions for recommendation training data quality
+-- Date: 2026-10-16
+-- Purpose: Compute role distribution and region coverage in Postgres so the admin API can run them concurrently
+
+-- Scan counts per role category for a given scan status
+CREATE OR REPLACE FUNCTION scan_role_distribution(scan_status VARCHAR DEFAULT 'completed')
+RETURNS TABLE (
+    role VARCHAR(100),
+    count BIGINT
+) AS $$
+    SELECT
+        COALESCE(role_category, 'Unknown') AS role,
+        COUNT(*) AS count
+    FROM market_scans
+    WHERE status = scan_status
+    GROUP BY COALESCE(role_category, 'Unknown')
+    ORDER BY count DESC;
+$$ LANGUAGE sql STABLE;
+
+-- How often each region is recommended across scans with a given status
+CREATE OR REPLACE FUNCTION scan_region_coverage(scan_status VARCHAR DEFAULT 'completed')
+RETURNS TABLE (
+    region TEXT,
+    count BIGINT
+) AS $$
+    SELECT
+        region,
+        COUNT(*) AS count
+    FROM market_scans,
+        jsonb_array_elements_text(
+            CASE WHEN jsonb_typeof(job_analysis->'recommended_regions') = 'array'
+                 THEN job_analysis->'recommended_regions'
+                 ELSE '[]'::jsonb
+            END
+        ) AS region
+    WHERE status = scan_status
+    GROUP BY region
+    ORDER BY count DESC;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION scan_role_distribution(VARCHAR) IS 'Role category distribution of scans with a given status, used for training data quality';
+COMMENT ON FUNCTION scan_region_coverage(VARCHAR) IS 'Recommended region coverage of scans with a given status, used for training data quality';